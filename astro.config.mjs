@@ -2,12 +2,18 @@
 import { defineConfig } from 'astro/config';
 import tailwind from '@astrojs/tailwind';
 import mdx from '@astrojs/mdx';
+import buildReport from './src/integrations/build-report';
+import ogPrefetch from './src/integrations/og-prefetch';
+import imagePipeline from './src/integrations/image-pipeline';
+import rehypeResponsiveImages from './src/utils/rehype-responsive-images';
 
 // https://astro.build/config
 export default defineConfig({
   site: 'https://smartsdlc.dev',
-  integrations: [tailwind(), mdx()],
+  // buildReport comes first so its timings wrap the other integrations
+  integrations: [buildReport(), tailwind(), mdx(), ogPrefetch(), imagePipeline()],
   markdown: {
+    rehypePlugins: [rehypeResponsiveImages],
     shikiConfig: {
       theme: 'github-dark',
       wrap: true,
@@ -0,0 +1,233 @@
+import { spawn } from 'child_process';
+import { createHash } from 'crypto';
+import { existsSync, mkdirSync, readdirSync, readFileSync, rmSync, writeFileSync } from 'fs';
+import { createServer } from 'http';
+import { dirname, join, relative, resolve } from 'path';
+import { fileURLToPath } from 'url';
+import type { BuildReport } from '../src/integrations/build-report';
+
+// Builds the site against a generated corpus of synthetic posts and fails when
+// build time or page weight regress past the stored baseline.
+//
+//   node --import @swc-node/register/esm-register scripts/benchmark-build.ts [--posts=200] [--embeds=4] [--latency=50] [--port=4599] [--runs=3] [--warm] [--baseline=path] [--update-baseline]
+//
+// UrlEmbeds point at a local server replaying the OG fixtures with --latency ms of delay, and
+// Notion collections load from empty snapshots, so runs need no network. Caches and encoded
+// images are cleared before each run unless --warm is passed. The build time compared is the
+// median of --runs builds.
+//
+// Build times only compare on the same machine, so the baseline is not committed: record one
+// with --update-baseline (e.g. on the main branch), then run without it to compare. A missing
+// baseline fails the run. It is kept in .cache/bench unless --baseline points elsewhere.
+
+const __dirname = dirname(fileURLToPath(import.meta.url));
+const ROOT = join(__dirname, '..');
+const BENCH_DIR = join(ROOT, '.cache', 'bench');
+const CONTENT_DIR = join(BENCH_DIR, 'content');
+const CACHE_DIR = join(BENCH_DIR, 'cache');
+// Encoded image variants, kept out of public/_img so cold runs always encode
+const IMAGE_OUTPUT_DIR = join(BENCH_DIR, 'img');
+const OUT_DIR = join(BENCH_DIR, 'dist');
+const REPORT_PATH = join(BENCH_DIR, 'build-report.json');
+const OG_FIXTURES_DIR = join(__dirname, 'fixtures', 'og-html');
+const IMAGES_DIR = join(ROOT, 'public', 'blog', 'images');
+
+const args = process.argv.slice(2);
+const option = (name: string, fallback: number) => Number(args.find((arg) => arg.startsWith(`--${name}=`))?.split('=')[1] ?? fallback);
+const postCount = option('posts', 200);
+const embedsPerPost = option('embeds', 4);
+const latency = option('latency', 50);
+// Fixed, so embed URLs (and the pages linking to them) are the same from run to run
+const port = option('port', 4599);
+const runs = option('runs', 3);
+const timeTolerance = option('time-tolerance', 0.2);
+const sizeTolerance = option('size-tolerance', 0.05);
+const warm = args.includes('--warm');
+const updateBaseline = args.includes('--update-baseline');
+const BASELINE_PATH = resolve(args.find((arg) => arg.startsWith('--baseline='))?.split('=')[1] ?? join(BENCH_DIR, 'baseline.json'));
+
+interface Baseline {
+  posts: number;
+  embedsPerPost: number;
+  // Median wall time of the runs
+  durationMs: number;
+  totalBytes: number;
+  maxPageBytes: number;
+}
+
+// Deterministic corpus: same seed, same posts, same page weights
+function createRandom(seed: number) {
+  return () => {
+    seed = (seed * 1664525 + 1013904223) % 4294967296;
+    return seed / 4294967296;
+  };
+}
+
+const random = createRandom(42);
+const pick = <T>(items: T[]): T => items[Math.floor(random() * items.length)];
+
+const WORDS = 'nx monorepo plugin workspace target cache affected graph executor generator task pipeline project library build test lint release module boundary developer experience tooling'.split(' ');
+const TAGS = ['nx', 'monorepo', 'typescript', 'javascript', 'angular', 'react', 'devops', 'ai'];
+
+function sentence(words: number): string {
+  const text = Array.from({ length: words }, () => pick(WORDS)).join(' ');
+  return `${text[0].toUpperCase()}${text.slice(1)}.`;
+}
+
+function paragraph(): string {
+  return Array.from({ length: 3 + Math.floor(random() * 4) }, () => sentence(8 + Math.floor(random() * 12))).join(' ');
+}
+
+const CODE_BLOCKS = [
+  ['ts', "import { CreateNodesV2 } from '@nx/devkit';\n\nexport const createNodesV2: CreateNodesV2 = [\n  '**/project.json',\n  async (configFiles, options, context) => {\n    return configFiles.map((file) => [file, { projects: {} }]);\n  },\n];"],
+  ['json', '{\n  "targetDefaults": {\n    "build": { "cache": true, "dependsOn": ["^build"] }\n  }\n}'],
+  ['bash', 'npx nx affected -t lint test build --parallel=3\nnpx nx graph --file=graph.json'],
+];
+
+function generatePost(index: number, images: string[], embedBaseUrl: string, embedImport: string): string {
+  const sections = Array.from({ length: Math.max(4, embedsPerPost) }, (_, section) => {
+    const [lang, code] = pick(CODE_BLOCKS);
+    const image = images.length ? `![Figure ${section}](/blog/images/${encodeURI(pick(images))})\n\n` : '';
+    const embed = section < embedsPerPost ? `<UrlEmbed url="${embedBaseUrl}/post-${index}/embed-${section}" />\n\n` : '';
+    return `## Section ${section + 1}\n\n${paragraph()}\n\n${image}\`\`\`${lang}\n${code}\n\`\`\`\n\n${embed}${paragraph()}\n`;
+  });
+  const publishedAt = new Date(Date.UTC(2020, 0, 1) + index * 86400000).toISOString().slice(0, 10);
+
+  return `---
+title: "Synthetic post ${index}: ${sentence(4).slice(0, -1)}"
+subtitle: "${sentence(8)}"
+publishedAt: ${publishedAt}
+tags:
+${[pick(TAGS), pick(TAGS)].map((tag) => `  - ${tag}`).join('\n')}
+---
+
+import UrlEmbed from "${embedImport}";
+
+${paragraph()}
+
+${sections.join('\n')}`;
+}
+
+function generateCorpus(embedBaseUrl: string): void {
+  rmSync(CONTENT_DIR, { recursive: true, force: true });
+  mkdirSync(CONTENT_DIR, { recursive: true });
+
+  const images = existsSync(IMAGES_DIR) ? readdirSync(IMAGES_DIR).sort() : [];
+  const embedImport = relative(CONTENT_DIR, join(ROOT, 'src', 'components', 'embeds', 'UrlEmbed.astro')).split('\\').join('/');
+  for (let index = 0; index < postCount; index++) {
+    writeFileSync(join(CONTENT_DIR, `synthetic-post-${index}.mdx`), generatePost(index, images, embedBaseUrl, embedImport));
+  }
+}
+
+// Empty Notion collections, so the offline build has snapshots to load
+function writeNotionSnapshots(): void {
+  mkdirSync(join(CACHE_DIR, 'notion'), { recursive: true });
+  for (const collection of ['talks', 'cfps', 'conferences']) {
+    writeFileSync(join(CACHE_DIR, 'notion', `${collection}.json`), JSON.stringify({ version: 1, syncedAt: new Date().toISOString(), pages: {} }));
+  }
+}
+
+// Replays the OG fixtures, with a fixed delay standing for network latency. The fixture
+// is picked from the URL, so an embed gets the same page whatever the request order.
+async function startEmbedServer(): Promise<{ url: string; close: () => void }> {
+  const pages = readdirSync(OG_FIXTURES_DIR).sort().map((file) => readFileSync(join(OG_FIXTURES_DIR, file)));
+  const server = createServer((request, response) => {
+    const index = createHash('sha1').update(request.url ?? '/').digest().readUInt32BE(0) % pages.length;
+    setTimeout(() => {
+      response.writeHead(200, { 'Content-Type': 'text/html; charset=utf-8' });
+      response.end(pages[index]);
+    }, latency);
+  });
+  await new Promise<void>((resolve) => server.listen(port, '127.0.0.1', resolve));
+  return { url: `http://127.0.0.1:${port}`, close: () => server.close() };
+}
+
+function runBuild(): Promise<number> {
+  const startedAt = performance.now();
+  return new Promise((resolve, reject) => {
+    const build = spawn(process.execPath, [join(ROOT, 'node_modules', 'astro', 'astro.js'), 'build', '--outDir', OUT_DIR], {
+      cwd: ROOT,
+      stdio: 'inherit',
+      env: { ...process.env, CACHE_DIR, IMAGE_OUTPUT_DIR, BLOG_CONTENT_DIR: CONTENT_DIR, BUILD_REPORT_PATH: REPORT_PATH, NOTION_OFFLINE: 'true' },
+    });
+    build.on('error', reject);
+    build.on('exit', (code) => (code === 0 ? resolve(performance.now() - startedAt) : reject(new Error(`astro build exited with code ${code}`))));
+  });
+}
+
+function median(values: number[]): number {
+  const sorted = [...values].sort((a, b) => a - b);
+  const middle = Math.floor(sorted.length / 2);
+  return sorted.length % 2 ? sorted[middle] : (sorted[middle - 1] + sorted[middle]) / 2;
+}
+
+function compare(name: string, current: number, baseline: number, tolerance: number) {
+  const change = baseline ? (current - baseline) / baseline : 0;
+  return { metric: name, baseline, current: Math.round(current), change: `${(change * 100).toFixed(1)}%`, regressed: change > tolerance };
+}
+
+async function main() {
+  if (!updateBaseline && !existsSync(BASELINE_PATH)) {
+    throw new Error(`No baseline at ${relative(ROOT, BASELINE_PATH)}: record one with --update-baseline`);
+  }
+
+  const server = await startEmbedServer();
+  const wallTimes: number[] = [];
+  try {
+    generateCorpus(server.url);
+    console.log(`Generated ${postCount} posts with ${embedsPerPost} embeds each in ${relative(ROOT, CONTENT_DIR)}`);
+    for (let run = 1; run <= runs; run++) {
+      if (!warm) {
+        rmSync(CACHE_DIR, { recursive: true, force: true });
+        rmSync(IMAGE_OUTPUT_DIR, { recursive: true, force: true });
+      }
+      writeNotionSnapshots();
+      wallTimes.push(await runBuild());
+      console.log(`Run ${run}/${runs}: ${Math.round(wallTimes.at(-1)!)}ms`);
+    }
+  } finally {
+    server.close();
+  }
+  const wallMs = median(wallTimes);
+
+  const report: BuildReport = JSON.parse(readFileSync(REPORT_PATH, 'utf-8'));
+  const current: Baseline = {
+    posts: postCount,
+    embedsPerPost,
+    durationMs: Math.round(wallMs),
+    totalBytes: report.totals.bytes.total,
+    maxPageBytes: report.totals.maxPageBytes,
+  };
+
+  console.table(report.phases.map(({ name, durationMs }) => ({ phase: name, ms: Math.round(durationMs) })));
+  console.table(report.counters);
+
+  if (updateBaseline) {
+    mkdirSync(dirname(BASELINE_PATH), { recursive: true });
+    writeFileSync(BASELINE_PATH, `${JSON.stringify(current, null, 2)}\n`);
+    console.log(`Baseline written to ${relative(ROOT, BASELINE_PATH)} (median of ${runs} runs)`);
+    return;
+  }
+
+  const baseline: Baseline = JSON.parse(readFileSync(BASELINE_PATH, 'utf-8'));
+  if (baseline.posts !== current.posts || baseline.embedsPerPost !== current.embedsPerPost) {
+    throw new Error(`Baseline was recorded with --posts=${baseline.posts} --embeds=${baseline.embedsPerPost}`);
+  }
+
+  const rows = [
+    compare('build ms', current.durationMs, baseline.durationMs, timeTolerance),
+    compare('total bytes', current.totalBytes, baseline.totalBytes, sizeTolerance),
+    compare('max page bytes', current.maxPageBytes, baseline.maxPageBytes, sizeTolerance),
+  ];
+  console.table(rows);
+
+  if (rows.some(({ regressed }) => regressed)) {
+    console.error(`Regression past the baseline (time +${timeTolerance * 100}%, size +${sizeTolerance * 100}%)`);
+    process.exitCode = 1;
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exitCode = 1;
+});
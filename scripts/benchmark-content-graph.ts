@@ -0,0 +1,98 @@
+import { buildContentGraph, type ContentCollections } from '../src/utils/content-graph';
+
+// Compares the indexed content graph with the previous per-talk linear joins on synthetic collections.
+//
+//   node --import @swc-node/register/esm-register scripts/benchmark-content-graph.ts [--sizes=1000,5000,20000]
+
+const args = process.argv.slice(2);
+const sizes = (args.find((arg) => arg.startsWith('--sizes='))?.split('=')[1] ?? '1000,5000,20000').split(',').map(Number);
+
+const DAY = 24 * 60 * 60 * 1000;
+
+function randomDate(): Date {
+  // Spread over the last ten years plus one year ahead
+  return new Date(Date.now() - Math.random() * 11 * 365 * DAY + 365 * DAY);
+}
+
+function generateCollections(size: number): ContentCollections {
+  const conferences = Array.from({ length: size }, (_, i) => ({
+    id: `conference-${i}`,
+    collection: 'conferences',
+    data: { properties: { name: `Conference ${i}`, date: { date: { start: randomDate().toISOString() } } } },
+  }));
+  const cfps = Array.from({ length: size }, (_, i) => ({
+    id: `cfp-${i}`,
+    collection: 'cfps',
+    data: { properties: { talk: `Talk ${i}` } },
+  }));
+  const talks = Array.from({ length: size }, (_, i) => ({
+    id: `talk-${i}`,
+    collection: 'talks',
+    data: {
+      properties: {
+        conference: { relation: [{ id: `conference-${Math.floor(Math.random() * size)}` }] },
+        talk: { relation: [{ id: `cfp-${Math.floor(Math.random() * size)}` }] },
+      },
+    },
+  }));
+  const posts = Array.from({ length: size }, (_, i) => ({
+    id: `post-${i}`,
+    collection: 'posts',
+    data: { title: `Post ${i}`, publishedAt: randomDate(), draft: i % 20 === 0, tags: [], type: 'article' },
+  }));
+
+  // Shapes match the collections' data; the content types themselves only exist inside Astro
+  return { posts, talks, conferences, cfps } as unknown as ContentCollections;
+}
+
+// Previous implementation from Contents.astro and blog/index.astro
+function legacyGraph({ posts, talks, conferences, cfps }: any) {
+  const publishedPosts = posts.filter(({ data }: any) => !data.draft);
+  const joinedTalks = talks.map((talk: any) => ({
+    ...talk,
+    data: {
+      ...talk.data,
+      properties: {
+        ...talk.data.properties,
+        conference: conferences.find((c: any) => c.id === talk.data.properties.conference.relation[0].id)?.data?.properties,
+        talk: cfps.find((c: any) => c.id === talk.data.properties.talk.relation[0].id)?.data?.properties,
+      },
+    },
+  }));
+
+  const getTime = (content: any) => {
+    if (content.collection === 'talks') return new Date(content.data.properties.conference.date?.date?.start).getTime();
+    if (content.collection === 'posts') return new Date(content.data.publishedAt).getTime();
+    return 0;
+  };
+
+  const now = Date.now();
+  const timeline = [...publishedPosts, ...joinedTalks].sort((a, b) => {
+    const timeA = getTime(a);
+    const timeB = getTime(b);
+    const isFutureA = timeA > now;
+    const isFutureB = timeB > now;
+    if (isFutureA && !isFutureB) return 1;
+    if (!isFutureA && isFutureB) return -1;
+    return timeB - timeA;
+  });
+
+  const sortedPosts = [...publishedPosts].sort((a, b) => new Date(b.data.publishedAt).getTime() - new Date(a.data.publishedAt).getTime());
+  return { timeline, posts: sortedPosts };
+}
+
+function time(fn: () => unknown): number {
+  const start = performance.now();
+  fn();
+  return performance.now() - start;
+}
+
+const rows = sizes.map((size) => {
+  const collections = generateCollections(size);
+  // Both pages used to query and join on their own, the graph is built once
+  const legacyMs = time(() => legacyGraph(collections)) + time(() => legacyGraph(collections));
+  const graphMs = time(() => buildContentGraph(collections));
+  return { 'items per collection': size, 'legacy ms': +legacyMs.toFixed(1), 'graph ms': +graphMs.toFixed(1), speedup: +(legacyMs / graphMs).toFixed(1) };
+});
+
+console.table(rows);
@@ -0,0 +1,128 @@
+import { mkdirSync, readdirSync, readFileSync, writeFileSync } from 'fs';
+import { join, dirname } from 'path';
+import { fileURLToPath } from 'url';
+import { readHtmlHead } from '../src/utils/html-head';
+import { extractOgMetadata } from '../src/utils/og-metadata';
+import { collectEmbedUrls } from '../src/utils/og-prefetch';
+
+// Compares the streaming <head> extractor with the previous full-body regex parsing.
+//
+//   node --import @swc-node/register/esm-register scripts/benchmark-og-parser.ts [--fetch] [--iterations=50]
+//
+// --fetch saves the current UrlEmbed pages into the fixture corpus before running.
+
+const __dirname = dirname(fileURLToPath(import.meta.url));
+const FIXTURES_DIR = join(__dirname, 'fixtures/og-html');
+const CHUNK_SIZE = 16 * 1024;
+
+const args = process.argv.slice(2);
+const iterations = Number(args.find((arg) => arg.startsWith('--iterations='))?.split('=')[1] ?? 50);
+
+// Previous implementation: full download, then regexes compiled per selector
+function legacyMetaContent(html: string, selectors: string[]): string | undefined {
+  for (const selector of selectors) {
+    const patterns = [
+      new RegExp(`<meta[^>]*property=["']${selector}["'][^>]*content=["']([^"']*)["']`, 'i'),
+      new RegExp(`<meta[^>]*content=["']([^"']*)["'][^>]*property=["']${selector}["']`, 'i'),
+      new RegExp(`<meta[^>]*name=["']${selector}["'][^>]*content=["']([^"']*)["']`, 'i'),
+      new RegExp(`<meta[^>]*content=["']([^"']*)["'][^>]*name=["']${selector}["']`, 'i'),
+    ];
+    for (const pattern of patterns) {
+      const match = html.match(pattern);
+      if (match?.[1]) return match[1];
+    }
+  }
+  return undefined;
+}
+
+function legacyExtract(html: string) {
+  const favicon = [
+    /<link[^>]*rel=["'](?:shortcut )?icon["'][^>]*href=["']([^"']*)["']/i,
+    /<link[^>]*href=["']([^"']*)["'][^>]*rel=["'](?:shortcut )?icon["']/i,
+    /<link[^>]*rel=["']apple-touch-icon["'][^>]*href=["']([^"']*)["']/i,
+  ]
+    .map((pattern) => html.match(pattern)?.[1])
+    .find(Boolean);
+
+  return {
+    title: legacyMetaContent(html, ['og:title', 'twitter:title']) || html.match(/<title[^>]*>([^<]*)<\/title>/i)?.[1],
+    description: legacyMetaContent(html, ['og:description', 'twitter:description', 'description']),
+    image: legacyMetaContent(html, ['og:image', 'twitter:image']),
+    siteName: legacyMetaContent(html, ['og:site_name']),
+    favicon,
+  };
+}
+
+// Replays a saved page as a chunked network body
+function toStream(bytes: Uint8Array): ReadableStream<Uint8Array> {
+  let offset = 0;
+  return new ReadableStream({
+    pull(controller) {
+      if (offset >= bytes.length) {
+        controller.close();
+        return;
+      }
+      controller.enqueue(bytes.subarray(offset, offset + CHUNK_SIZE));
+      offset += CHUNK_SIZE;
+    },
+  });
+}
+
+function median(values: number[]): number {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+async function fetchFixtures(): Promise<void> {
+  mkdirSync(FIXTURES_DIR, { recursive: true });
+  for (const url of collectEmbedUrls()) {
+    try {
+      const response = await fetch(url, { signal: AbortSignal.timeout(10000) });
+      if (!response.ok) continue;
+      const name = url.replace(/^https?:\/\//, '').replace(/[^\w.-]+/g, '_').slice(0, 100);
+      writeFileSync(join(FIXTURES_DIR, `${name}.html`), await response.text(), 'utf-8');
+      console.log(`Saved ${url}`);
+    } catch (error) {
+      console.warn(`Skipped ${url}:`, error);
+    }
+  }
+}
+
+async function benchmark(): Promise<void> {
+  const fixtures = readdirSync(FIXTURES_DIR).filter((file) => file.endsWith('.html'));
+  const rows = [];
+
+  for (const file of fixtures) {
+    const bytes = new Uint8Array(readFileSync(join(FIXTURES_DIR, file)));
+    const regexTimes: number[] = [];
+    const streamTimes: number[] = [];
+    let streamBytes = 0;
+
+    for (let i = 0; i < iterations; i++) {
+      let start = performance.now();
+      legacyExtract(new TextDecoder().decode(bytes));
+      regexTimes.push(performance.now() - start);
+
+      start = performance.now();
+      const head = await readHtmlHead(toStream(bytes));
+      extractOgMetadata(head, 'https://example.com/');
+      streamTimes.push(performance.now() - start);
+      streamBytes = head.bytesRead;
+    }
+
+    rows.push({
+      fixture: file,
+      'regex KB': +(bytes.length / 1024).toFixed(1),
+      'stream KB': +(streamBytes / 1024).toFixed(1),
+      'regex ms': +median(regexTimes).toFixed(3),
+      'stream ms': +median(streamTimes).toFixed(3),
+    });
+  }
+
+  console.table(rows);
+}
+
+if (args.includes('--fetch')) {
+  await fetchFixtures();
+}
+await benchmark();
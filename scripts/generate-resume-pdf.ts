@@ -1,7 +1,15 @@
-import puppeteer from 'puppeteer';
-import { readFileSync } from 'fs';
+import puppeteer, { type Browser, type Page, type PDFOptions } from 'puppeteer';
+import { createHash } from 'crypto';
+import { existsSync, mkdirSync, readFileSync, writeFileSync } from 'fs';
 import { join, dirname } from 'path';
 import { fileURLToPath } from 'url';
+import { runPool } from '../src/utils/pool';
+
+// Renders every resume variant with one warm browser.
+//
+//   node --import @swc-node/register/esm-register scripts/generate-resume-pdf.ts [--force] [--only=full,short]
+//
+// Variants whose HTML and PDF options did not change since the last run are skipped.
 
 const __dirname = dirname(fileURLToPath(import.meta.url));
 const cvData = JSON.parse(readFileSync(join(__dirname, '../src/content/cv/cv.json'), 'utf-8'));
@@ -20,7 +28,7 @@ function getYearsOfExperience(): number {
   return currentYear - startYear;
 }
 
-// Get all unique skills from all experiences
+// Get all unique skills from all experiences, as cv.json spells them (ReactJS, Nrwl Nx, Angular 2+, ...), most used first
 function getAllSkills(): string[] {
   const allSkills = cvData.experiences.flatMap((exp: any) => exp.skills || []);
   const skillCount = allSkills.reduce((acc: any, skill: string) => {
@@ -29,14 +37,74 @@ function getAllSkills(): string[] {
   }, {});
   return Object.entries(skillCount)
     .sort((a: any, b: any) => b[1] - a[1])
-    .slice(0, 30)
     .map(([skill]) => skill);
 }
 
-const keySkills = getAllSkills();
-const allExperiences = cvData.experiences;
+// Focus lists are picked from those names, so every entry matches an experience
+function skillsMatching(pattern: RegExp): string[] {
+  return getAllSkills().filter((skill) => pattern.test(skill));
+}
+
+interface ResumeVariant {
+  name: string;
+  output: string;
+  // Keep only the most recent experiences
+  maxExperiences?: number;
+  maxAccomplishments?: number;
+  // Keep experiences using one of these skills, and list them first
+  focusSkills?: string[];
+}
+
+const VARIANTS: ResumeVariant[] = [
+  { name: 'full', output: 'jonathan-gelin-resume.pdf' },
+  { name: 'short', output: 'jonathan-gelin-resume-short.pdf', maxExperiences: 5, maxAccomplishments: 4 },
+  {
+    name: 'frontend',
+    output: 'jonathan-gelin-resume-frontend.pdf',
+    focusSkills: skillsMatching(
+      /^(nx|nrwl nx|monorepo \(nrwl\/nx\)|typescript|angular.*|react.*|redux|rxjs|webpack.*|module federation|single[- ]spa|micro[- ]frontends?.*|systemjs|storybook|tailwind.*|cypress|jest|playwright)$/i,
+    ),
+  },
+];
+
+const PDF_OPTIONS: PDFOptions = {
+  format: 'A4',
+  printBackground: true,
+  margin: {
+    top: '15mm',
+    right: '0',
+    bottom: '15mm',
+    left: '0',
+  },
+};
+
+// Number of pages rendering in parallel in the shared browser
+const PAGE_POOL_SIZE = 3;
 
-const html = `
+const HASHES_PATH = join(__dirname, '../.cache/resume-pdf.json');
+
+function selectExperiences({ maxExperiences, maxAccomplishments, focusSkills }: ResumeVariant): any[] {
+  let experiences = cvData.experiences;
+
+  if (focusSkills) {
+    const focus = new Set(focusSkills);
+    experiences = experiences
+      .filter((exp: any) => (exp.skills || []).some((skill: string) => focus.has(skill)))
+      .map((exp: any) => ({
+        ...exp,
+        skills: [...(exp.skills || [])].sort((a: string, b: string) => Number(focus.has(b)) - Number(focus.has(a))),
+      }));
+  }
+
+  return experiences.slice(0, maxExperiences).map((exp: any) => ({
+    ...exp,
+    accomplishments: exp.accomplishments?.slice(0, maxAccomplishments),
+  }));
+}
+
+function renderResume(variant: ResumeVariant): string {
+  const experiences = selectExperiences(variant);
+  return `
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -360,7 +428,7 @@ const html = `
     <!-- Professional Experience -->
     <div class="section">
       <h2 class="section-title">Professional Experience</h2>
-      ${allExperiences
+      ${experiences
         .map(
           (exp: any) => `
         <div class="experience">
@@ -394,38 +462,92 @@ const html = `
 </body>
 </html>
 `;
+}
 
-async function generatePDF() {
-  console.log('Launching browser...');
-  const browser = await puppeteer.launch({
-    headless: true,
-  });
+function loadHashes(): Record<string, string> {
+  return existsSync(HASHES_PATH) ? JSON.parse(readFileSync(HASHES_PATH, 'utf-8')) : {};
+}
+
+function saveHashes(hashes: Record<string, string>): void {
+  mkdirSync(dirname(HASHES_PATH), { recursive: true });
+  writeFileSync(HASHES_PATH, JSON.stringify(hashes, null, 2), 'utf-8');
+}
 
+async function openPage(browser: Browser): Promise<Page> {
   const page = await browser.newPage();
+  // The resume is self-contained: block any request so rendering never waits on the network
+  await page.setRequestInterception(true);
+  page.on('request', (request) => (request.url().startsWith('data:') ? request.continue() : request.abort()));
+  return page;
+}
 
-  console.log('Setting content...');
-  await page.setContent(html, {
-    waitUntil: 'networkidle0',
-  });
+async function generatePDFs() {
+  const args = process.argv.slice(2);
+  const force = args.includes('--force');
+  const only = args.find((arg) => arg.startsWith('--only='))?.split('=')[1].split(',');
+
+  const hashes = loadHashes();
+  const timings: Record<string, string | number>[] = [];
 
-  const outputPath = join(__dirname, '../jonathan-gelin-resume.pdf');
+  const pending = VARIANTS.filter(({ name }) => !only || only.includes(name)).flatMap((variant) => {
+    const html = renderResume(variant);
+    const hash = createHash('sha256').update(html).update(JSON.stringify(PDF_OPTIONS)).digest('hex');
+    const outputPath = join(__dirname, '..', variant.output);
 
-  console.log('Generating PDF...');
-  await page.pdf({
-    path: outputPath,
-    format: 'A4',
-    printBackground: true,
-    margin: {
-      top: '15mm',
-      right: '0',
-      bottom: '15mm',
-      left: '0',
-    },
+    if (!force && hashes[variant.name] === hash && existsSync(outputPath)) {
+      timings.push({ variant: variant.name, status: 'unchanged' });
+      return [];
+    }
+    return [{ variant, html, hash, outputPath }];
   });
 
-  await browser.close();
+  if (pending.length > 0) {
+    const launchStart = performance.now();
+    const browser = await puppeteer.launch({
+      headless: true,
+    });
+    const pages = await Promise.all(Array.from({ length: Math.min(PAGE_POOL_SIZE, pending.length) }, () => openPage(browser)));
+    const launchMs = performance.now() - launchStart;
+
+    try {
+      await runPool(
+        pending,
+        async ({ variant, html, hash, outputPath }) => {
+          const page = pages.pop()!;
+          try {
+            const layoutStart = performance.now();
+            await page.setContent(html, { waitUntil: 'load' });
+            await page.evaluate(() => document.fonts.ready);
+            const layoutMs = performance.now() - layoutStart;
+
+            const pdfStart = performance.now();
+            await page.pdf({ ...PDF_OPTIONS, path: outputPath });
+            const pdfMs = performance.now() - pdfStart;
+
+            hashes[variant.name] = hash;
+            timings.push({ variant: variant.name, status: 'rendered', 'layout ms': Math.round(layoutMs), 'pdf ms': Math.round(pdfMs), output: variant.output });
+          } catch (error) {
+            // Keep rendering the other variants, but fail the run
+            timings.push({ variant: variant.name, status: 'failed', error: error instanceof Error ? error.message : String(error) });
+            process.exitCode = 1;
+          } finally {
+            pages.push(page);
+          }
+        },
+        { concurrency: pages.length },
+      );
+    } finally {
+      await browser.close();
+    }
+
+    saveHashes(hashes);
+    console.log(`Browser launched in ${Math.round(launchMs)}ms with ${pages.length} page(s)`);
+  }
 
-  console.log(`PDF generated successfully: ${outputPath}`);
+  console.table(timings);
 }
 
-generatePDF().catch(console.error);
+generatePDFs().catch((error) => {
+  console.error(error);
+  process.exitCode = 1;
+});
@@ -1,33 +1,43 @@
 import { defineCollection } from 'astro:content';
 import { glob } from 'astro/loaders';
-import { notionLoader } from 'notion-astro-loader';
+import { notionSnapshotLoader } from '../loaders/notion/loader';
 import { TalksPageSchema, CFPsPageSchema, ConferencesPageSchema } from '../loaders/talks/schemas';
 import { blogSchema } from './blog/_schema';
 
+// The build benchmark points BLOG_CONTENT_DIR at a generated corpus
+const blogContentDir = import.meta.env.BLOG_CONTENT_DIR ?? './src/content/blog';
+
+// Set NOTION_OFFLINE=true (e.g. in CI) to build from the local snapshot only
+const notionOptions = {
+  auth: import.meta.env.NOTION_TOKEN,
+  offline: import.meta.env.NOTION_OFFLINE === 'true',
+  baseUrl: import.meta.env.NOTION_API_URL,
+};
+
 const posts = defineCollection({
-  loader: glob({ pattern: '**/*.{md,mdx}', base: './src/content/blog' }),
+  loader: glob({ pattern: '**/*.{md,mdx}', base: blogContentDir }),
   schema: blogSchema,
 });
 
 const talks = defineCollection({
-  loader: notionLoader({
-    auth: import.meta.env.NOTION_TOKEN,
+  loader: notionSnapshotLoader({
+    ...notionOptions,
     database_id: import.meta.env.NOTION_DATABASE_ID_TALKS,
   }),
   schema: TalksPageSchema,
 });
 
 const cfps = defineCollection({
-  loader: notionLoader({
-    auth: import.meta.env.NOTION_TOKEN,
+  loader: notionSnapshotLoader({
+    ...notionOptions,
     database_id: import.meta.env.NOTION_DATABASE_ID_CFPS,
   }),
   schema: CFPsPageSchema,
 });
 
 const conferences = defineCollection({
-  loader: notionLoader({
-    auth: import.meta.env.NOTION_TOKEN,
+  loader: notionSnapshotLoader({
+    ...notionOptions,
     database_id: import.meta.env.NOTION_DATABASE_ID_CONFERENCE,
   }),
   schema: ConferencesPageSchema,
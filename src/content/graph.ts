@@ -0,0 +1,23 @@
+import { getCollection } from 'astro:content';
+import { buildContentGraph, type ContentGraph } from '../utils/content-graph';
+
+let graph: Promise<ContentGraph> | undefined;
+
+/**
+ * Posts, talks, conferences and CFPs loaded and joined once per build.
+ * The dev server rebuilds it on every call so content edits show up.
+ */
+export function getContentGraph(): Promise<ContentGraph> {
+  if (!graph || import.meta.env.DEV) {
+    graph = Promise.all([getCollection('posts'), getCollection('talks'), getCollection('conferences'), getCollection('cfps')]).then(
+      ([posts, talks, conferences, cfps]) => {
+        const contentGraph = buildContentGraph({ posts, talks, conferences, cfps });
+        for (const { id } of contentGraph.unresolvedTalks) {
+          console.warn(`Talk ${id} is missing its conference or CFP, it is left out of the timeline`);
+        }
+        return contentGraph;
+      },
+    );
+  }
+  return graph;
+}
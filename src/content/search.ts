@@ -0,0 +1,83 @@
+import { createHash } from 'node:crypto';
+import { existsSync, mkdirSync, readFileSync, writeFileSync } from 'node:fs';
+import { dirname, join } from 'node:path';
+import { getContentGraph } from './graph';
+import { buildSearchIndex, indexDocument, MANIFEST_SIZE_BUDGET, SHARD_SIZE_BUDGET, toSearchManifest, type DocumentTerms, type SearchIndex } from '../utils/search-index';
+import { CACHE_DIR } from '../utils/cache-dir';
+import { measurePhase } from '../utils/build-metrics';
+
+type TermsCache = Record<string, { digest: string; terms: DocumentTerms }>;
+
+// Tokenized posts from previous builds, so only changed posts are re-indexed
+const CACHE_PATH = join(CACHE_DIR, 'search-terms.json');
+
+let index: Promise<SearchIndex> | undefined;
+
+function loadCache(): TermsCache {
+  try {
+    if (existsSync(CACHE_PATH)) {
+      return JSON.parse(readFileSync(CACHE_PATH, 'utf-8'));
+    }
+  } catch (error) {
+    console.warn('Failed to load search cache:', error);
+  }
+  return {};
+}
+
+function saveCache(cache: TermsCache): void {
+  try {
+    mkdirSync(dirname(CACHE_PATH), { recursive: true });
+    writeFileSync(CACHE_PATH, JSON.stringify(cache), 'utf-8');
+  } catch (error) {
+    console.warn('Failed to save search cache:', error);
+  }
+}
+
+async function buildIndex(): Promise<SearchIndex> {
+  const { posts } = await getContentGraph();
+  const previous = loadCache();
+  const cache: TermsCache = {};
+  let changed = posts.length !== Object.keys(previous).length;
+
+  const documents = posts.map((post) => {
+    const { title, subtitle, tags } = post.data;
+    const body = post.body ?? '';
+    const digest = createHash('sha256').update(JSON.stringify([title, subtitle, tags, body])).digest('hex');
+
+    let terms = previous[post.id]?.digest === digest ? previous[post.id].terms : undefined;
+    if (!terms) {
+      terms = indexDocument({ slug: post.id, title, subtitle, tags, body });
+      changed = true;
+    }
+    cache[post.id] = { digest, terms };
+
+    return { doc: { slug: post.id, title, subtitle }, terms };
+  });
+
+  if (changed) {
+    saveCache(cache);
+  }
+
+  const searchIndex = buildSearchIndex(documents);
+  for (const [key, shard] of Object.entries(searchIndex.shards)) {
+    const size = JSON.stringify(shard).length;
+    if (size > SHARD_SIZE_BUDGET) {
+      console.warn(`Search shard "${key}" is ${Math.round(size / 1024)} KB, above the ${SHARD_SIZE_BUDGET / 1024} KB budget`);
+    }
+  }
+  const manifestSize = JSON.stringify(toSearchManifest(searchIndex)).length;
+  if (manifestSize > MANIFEST_SIZE_BUDGET) {
+    console.warn(`Search manifest is ${Math.round(manifestSize / 1024)} KB, above the ${MANIFEST_SIZE_BUDGET / 1024} KB budget`);
+  }
+  return searchIndex;
+}
+
+/**
+ * Inverted index of the published posts, built once per build.
+ */
+export function getSearchIndex(): Promise<SearchIndex> {
+  if (!index || import.meta.env.DEV) {
+    index = measurePhase('search-index', buildIndex);
+  }
+  return index;
+}
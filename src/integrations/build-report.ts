@@ -0,0 +1,128 @@
+import { mkdirSync, writeFileSync } from 'node:fs';
+import { dirname, join, resolve } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import type { AstroIntegration } from 'astro';
+import { getBuildMetrics, type PhaseTiming } from '../utils/build-metrics';
+import { CACHE_DIR } from '../utils/cache-dir';
+import { measurePageWeights, type PageWeight, type ResourceBytes } from '../utils/page-weight';
+
+export interface BuildReportOptions {
+  // Where the JSON report is written, defaults to BUILD_REPORT_PATH or .cache/build-report.json
+  path?: string;
+}
+
+export interface PageReport extends PageWeight {
+  renderMs?: number;
+}
+
+export interface BuildReport {
+  generatedAt: string;
+  durationMs: number;
+  // Astro build steps between hooks, then the steps timed by loaders and integrations
+  phases: PhaseTiming[];
+  counters: Record<string, number>;
+  pages: PageReport[];
+  totals: {
+    pages: number;
+    renderMs: number;
+    bytes: ResourceBytes & { total: number };
+    maxPageBytes: number;
+    external: string[];
+  };
+}
+
+// Ordered hooks: each step lasts from its hook to the next one
+const STEPS = [
+  ['astro:config:done', 'content-sync'],
+  ['astro:build:start', 'integrations'],
+  ['astro:build:setup', 'bundle-and-render'],
+  ['astro:build:generated', 'finalize'],
+] as const;
+
+function trimSlash(route: string): string {
+  return route.replace(/\/+$/, '') || '/';
+}
+
+function formatBytes(bytes: number): string {
+  return bytes < 1024 * 1024 ? `${(bytes / 1024).toFixed(1)} KB` : `${(bytes / 1024 / 1024).toFixed(2)} MB`;
+}
+
+/**
+ * Record where build time goes (hook-to-hook steps, loader and integration
+ * phases, per-page render times), how many network requests embeds made and
+ * the bytes each route emits, into a machine-readable report.
+ *
+ * Register it first so its timestamps wrap the other integrations' hooks.
+ */
+export default function buildReport({ path = process.env.BUILD_REPORT_PATH }: BuildReportOptions = {}): AstroIntegration {
+  const reportPath = path ? resolve(path) : join(CACHE_DIR, 'build-report.json');
+  const marks = new Map<string, number>();
+  const mark = (hook: string) => {
+    if (!marks.has(hook)) marks.set(hook, performance.now());
+  };
+
+  return {
+    name: 'build-report',
+    hooks: {
+      'astro:config:setup': () => mark('astro:config:setup'),
+      'astro:config:done': () => mark('astro:config:done'),
+      'astro:build:start': () => mark('astro:build:start'),
+      'astro:build:setup': () => mark('astro:build:setup'),
+      'astro:build:generated': () => mark('astro:build:generated'),
+      'astro:build:done': ({ dir, logger }) => {
+        mark('astro:build:done');
+        const metrics = getBuildMetrics();
+
+        const hooks = [...STEPS.map(([hook]) => hook), 'astro:build:done' as const];
+        const steps = STEPS.flatMap(([hook, name], index) => {
+          const start = marks.get(hook);
+          const end = marks.get(hooks[index + 1]);
+          return start !== undefined && end !== undefined ? [{ name, durationMs: end - start }] : [];
+        });
+
+        const renderTimes = new Map(metrics.pages.map(({ route, durationMs }) => [trimSlash(route), durationMs]));
+        const pages: PageReport[] = measurePageWeights(fileURLToPath(dir)).map((page) => ({ ...page, renderMs: renderTimes.get(trimSlash(page.route)) }));
+
+        const bytes = { html: 0, js: 0, css: 0, image: 0, font: 0, other: 0, total: 0 };
+        for (const page of pages) {
+          for (const type of Object.keys(bytes) as (keyof typeof bytes)[]) {
+            bytes[type] += page.bytes[type];
+          }
+        }
+
+        const report: BuildReport = {
+          generatedAt: new Date().toISOString(),
+          durationMs: marks.get('astro:build:done')! - (marks.get('astro:config:setup') ?? 0),
+          phases: [...steps, ...metrics.phases],
+          counters: metrics.counters,
+          pages,
+          totals: {
+            pages: pages.length,
+            renderMs: metrics.pages.reduce((sum, { durationMs }) => sum + durationMs, 0),
+            bytes,
+            maxPageBytes: Math.max(0, ...pages.map((page) => page.bytes.total)),
+            external: [...new Set(pages.flatMap((page) => page.external))],
+          },
+        };
+
+        try {
+          mkdirSync(dirname(reportPath), { recursive: true });
+          writeFileSync(reportPath, JSON.stringify(report, null, 2), 'utf-8');
+        } catch (error) {
+          logger.warn(`Failed to write build report: ${error}`);
+        }
+
+        logger.info(`Build took ${Math.round(report.durationMs)}ms, ${pages.length} pages weigh ${formatBytes(bytes.total)} (report: ${reportPath})`);
+        logger.info(`Phases: ${report.phases.map(({ name, durationMs }) => `${name} ${Math.round(durationMs)}ms`).join(', ')}`);
+        const counters = Object.entries(report.counters);
+        if (counters.length) {
+          logger.info(`Requests: ${counters.map(([name, count]) => `${name} ${count}`).join(', ')}`);
+        }
+        for (const page of [...pages].sort((a, b) => b.bytes.total - a.bytes.total).slice(0, 5)) {
+          const render = page.renderMs !== undefined ? `, rendered in ${Math.round(page.renderMs)}ms` : '';
+          logger.info(`  ${page.route}: ${formatBytes(page.bytes.total)} (images ${formatBytes(page.bytes.image)}, js ${formatBytes(page.bytes.js)})${render}`);
+        }
+      },
+    },
+  };
+}
@@ -0,0 +1,26 @@
+import { fileURLToPath } from 'node:url';
+import type { AstroIntegration, AstroIntegrationLogger } from 'astro';
+import { recordPhase } from '../utils/build-metrics';
+import { copyImageVariants, optimizeImages, type ImagePipelineOptions } from '../utils/image-pipeline';
+
+/**
+ * Encode responsive variants of the public blog images before pages are
+ * rendered, so markdown images and covers can reference them.
+ */
+export default function imagePipeline(options: ImagePipelineOptions = {}): AstroIntegration {
+  const run = async (logger: AstroIntegrationLogger) => {
+    const { total, encoded, cached, failed, variants, durationMs } = await optimizeImages(options);
+    recordPhase('images', durationMs);
+    logger.info(`${total} images in ${Math.round(durationMs)}ms: ${encoded} encoded, ${cached} cached, ${failed} failed (${variants} variants)`);
+  };
+
+  return {
+    name: 'image-pipeline',
+    hooks: {
+      'astro:build:start': ({ logger }) => run(logger),
+      // Before build:done, so the build report weighs the copied variants
+      'astro:build:generated': ({ dir }) => copyImageVariants(fileURLToPath(dir)),
+      'astro:server:setup': ({ logger }) => run(logger),
+    },
+  };
+}
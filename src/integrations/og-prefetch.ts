@@ -0,0 +1,41 @@
+import type { AstroIntegration } from 'astro';
+import { recordPhase } from '../utils/build-metrics';
+import { configureOgCache, flushOgCache, settleOgRevalidations, type OgCacheOptions } from '../utils/og-metadata';
+import { formatOgPrefetchReport, prefetchOgMetadata, type OgPrefetchOptions, type OgPrefetchReport } from '../utils/og-prefetch';
+
+/**
+ * Prefetch all UrlEmbed metadata before pages are rendered and write the
+ * OG cache to disk once the build is done. Expired entries are served stale
+ * and refreshed in the background while pages render, unless
+ * `staleWhileRevalidate` is disabled.
+ */
+export default function ogPrefetch({ staleWhileRevalidate = true, ...options }: OgPrefetchOptions & OgCacheOptions = {}): AstroIntegration {
+  // Refresh of the stale entries, left running while pages render
+  let revalidation: Promise<OgPrefetchReport> | undefined;
+
+  return {
+    name: 'og-prefetch',
+    hooks: {
+      'astro:config:setup': ({ command }) => {
+        // Builds flush once in astro:build:done and refresh stale entries through the prefetch pool,
+        // the dev server relies on the delayed write and refreshes entries as pages ask for them
+        const isBuild = command === 'build';
+        configureOgCache({ staleWhileRevalidate, explicitFlush: isBuild, deferRevalidation: isBuild });
+      },
+      'astro:build:start': async ({ logger }) => {
+        const report = await prefetchOgMetadata(options);
+        revalidation = report.revalidation;
+        recordPhase('og-prefetch', report.durationMs);
+        formatOgPrefetchReport(report).forEach((line) => logger.info(line));
+      },
+      'astro:build:done': async ({ logger }) => {
+        if (revalidation) {
+          const report = await revalidation;
+          formatOgPrefetchReport(report).forEach((line) => logger.info(`Background refresh: ${line}`));
+        }
+        await settleOgRevalidations();
+        flushOgCache();
+      },
+    },
+  };
+}
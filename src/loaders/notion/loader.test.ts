@@ -0,0 +1,216 @@
+import assert from 'node:assert/strict';
+import { existsSync, mkdirSync, mkdtempSync, readFileSync, writeFileSync } from 'node:fs';
+import { createServer, type Server } from 'node:http';
+import type { AddressInfo } from 'node:net';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { after, before, describe, test } from 'node:test';
+
+// The snapshot folder is read when the module loads, so the loader is imported once it is set
+const cacheDir = mkdtempSync(join(tmpdir(), 'notion-loader-'));
+process.env.CACHE_DIR = cacheDir;
+
+const HOUR = 60 * 60 * 1000;
+const DAY = 24 * HOUR;
+
+interface QueryBody {
+  page_size: number;
+  start_cursor?: string;
+  filter?: { timestamp: string; last_edited_time: { on_or_after: string } };
+}
+
+interface StoreEntry {
+  id: string;
+  data: unknown;
+  digest?: string;
+}
+
+type QueryHandler = (body: QueryBody) => { status?: number; json?: unknown };
+
+let loader: typeof import('./loader');
+let server: Server;
+let baseUrl: string;
+
+// Per-database handlers of the stub server, and the bodies of every query it received
+const databases = new Map<string, QueryHandler>();
+const queries: { databaseId: string; authorization?: string; body: QueryBody }[] = [];
+
+function page(id: string, editedAt: string, extra: object = {}) {
+  return { id, last_edited_time: editedAt, properties: { name: id }, ...extra };
+}
+
+function writeSnapshot(collection: string, syncedAt: string, pages: ReturnType<typeof page>[]): void {
+  mkdirSync(join(cacheDir, 'notion'), { recursive: true });
+  writeFileSync(join(cacheDir, 'notion', `${collection}.json`), JSON.stringify({ version: 1, syncedAt, pages: Object.fromEntries(pages.map((p) => [p.id, p])) }));
+}
+
+function readSnapshot(collection: string) {
+  return JSON.parse(readFileSync(join(cacheDir, 'notion', `${collection}.json`), 'utf-8'));
+}
+
+// The parts of Astro's loader context the loader uses
+function createContext(collection: string, existing: { id: string; digest: string }[] = []) {
+  const entries = new Map<string, StoreEntry>(existing.map((entry) => [entry.id, { ...entry, data: {} }]));
+  const parsed: string[] = [];
+  const warnings: string[] = [];
+  const context = {
+    collection,
+    store: {
+      keys: () => [...entries.keys()],
+      get: (id: string) => entries.get(id),
+      set: (entry: StoreEntry) => entries.set(entry.id, entry),
+      delete: (id: string) => entries.delete(id),
+    },
+    logger: { info: () => {}, warn: (message: string) => warnings.push(message) },
+    parseData: async ({ id, data }: { id: string; data: unknown }) => {
+      parsed.push(id);
+      return data;
+    },
+  };
+  return { context, entries, parsed, warnings };
+}
+
+async function load(collection: string, options: Parameters<typeof loader.notionSnapshotLoader>[0], existing?: { id: string; digest: string }[]) {
+  const { context, ...rest } = createContext(collection, existing);
+  // The loader only touches the members above
+  await loader.notionSnapshotLoader(options).load(context as never);
+  return rest;
+}
+
+function queriesOf(databaseId: string) {
+  return queries.filter((query) => query.databaseId === databaseId);
+}
+
+before(async () => {
+  server = createServer((request, response) => {
+    const match = request.url?.match(/^\/v1\/databases\/([^/]+)\/query$/);
+    const handler = match && request.method === 'POST' ? databases.get(match[1]) : undefined;
+    let raw = '';
+    request.on('data', (chunk) => (raw += chunk));
+    request.on('end', () => {
+      if (!match || !handler) {
+        response.writeHead(404).end();
+        return;
+      }
+      const body: QueryBody = JSON.parse(raw);
+      queries.push({ databaseId: match[1], authorization: request.headers.authorization, body });
+      const { status = 200, json = {} } = handler(body);
+      response.writeHead(status, { 'Content-Type': 'application/json' }).end(JSON.stringify(json));
+    });
+  });
+  await new Promise<void>((resolve) => server.listen(0, '127.0.0.1', resolve));
+  baseUrl = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+
+  loader = await import('./loader');
+});
+
+after(() => {
+  server.close();
+});
+
+describe('notion snapshot loader', () => {
+  test('runs a full sync through every page of results', async () => {
+    databases.set('full', ({ start_cursor }) =>
+      start_cursor === 'second'
+        ? { json: { results: [page('b', '2026-01-02T00:00:00.000Z')], has_more: false, next_cursor: null } }
+        : { json: { results: [page('a', '2026-01-01T00:00:00.000Z')], has_more: true, next_cursor: 'second' } },
+    );
+
+    const { entries } = await load('full', { auth: 'secret', database_id: 'full', baseUrl });
+
+    const sent = queriesOf('full');
+    assert.equal(sent.length, 2);
+    assert.equal(sent[0].authorization, 'Bearer secret');
+    assert.equal(sent[0].body.filter, undefined);
+    assert.equal(sent[0].body.start_cursor, undefined);
+    assert.equal(sent[1].body.start_cursor, 'second');
+    assert.deepEqual([...entries.keys()].sort(), ['a', 'b']);
+    assert.deepEqual(Object.keys(readSnapshot('full').pages).sort(), ['a', 'b']);
+  });
+
+  test('only asks for pages edited since the last sync and merges them', async () => {
+    const syncedAt = new Date(Date.now() - HOUR).toISOString();
+    writeSnapshot('incremental', syncedAt, [page('kept', '2026-01-01T00:00:00.000Z'), page('edited', '2026-01-01T00:00:00.000Z'), page('archived', '2026-01-01T00:00:00.000Z')]);
+    databases.set('incremental', () => ({
+      json: {
+        results: [page('edited', '2026-02-01T00:00:00.000Z'), page('archived', '2026-02-01T00:00:00.000Z', { archived: true }), page('added', '2026-02-01T00:00:00.000Z')],
+        has_more: false,
+        next_cursor: null,
+      },
+    }));
+
+    // The data store already holds the snapshot's pages
+    const { entries, parsed } = await load('incremental', { auth: 'secret', database_id: 'incremental', baseUrl }, [
+      { id: 'kept', digest: '2026-01-01T00:00:00.000Z' },
+      { id: 'edited', digest: '2026-01-01T00:00:00.000Z' },
+      { id: 'archived', digest: '2026-01-01T00:00:00.000Z' },
+    ]);
+
+    const [{ body }] = queriesOf('incremental');
+    assert.deepEqual(body.filter, {
+      timestamp: 'last_edited_time',
+      // Two minutes of margin, as Notion rounds edit times down to the minute
+      last_edited_time: { on_or_after: new Date(new Date(syncedAt).getTime() - 2 * 60 * 1000).toISOString() },
+    });
+    assert.deepEqual([...entries.keys()].sort(), ['added', 'edited', 'kept']);
+    assert.equal(entries.get('edited')!.digest, '2026-02-01T00:00:00.000Z');
+    // Unchanged digests are not parsed again
+    assert.deepEqual(parsed.sort(), ['added', 'edited']);
+  });
+
+  test('runs a full sync once a day, dropping pages removed from the database', async () => {
+    writeSnapshot('daily', new Date(Date.now() - 2 * DAY).toISOString(), [page('removed', '2026-01-01T00:00:00.000Z')]);
+    databases.set('daily', () => ({ json: { results: [page('current', '2026-01-01T00:00:00.000Z')], has_more: false, next_cursor: null } }));
+
+    const { entries } = await load('daily', { auth: 'secret', database_id: 'daily', baseUrl }, [{ id: 'removed', digest: '2026-01-01T00:00:00.000Z' }]);
+
+    assert.equal(queriesOf('daily')[0].body.filter, undefined);
+    assert.deepEqual([...entries.keys()], ['current']);
+  });
+
+  test('reuses a recent snapshot without querying Notion', async () => {
+    writeSnapshot('recent', new Date(Date.now() - 60 * 1000).toISOString(), [page('a', '2026-01-01T00:00:00.000Z')]);
+    databases.set('recent', () => ({ json: { results: [], has_more: false, next_cursor: null } }));
+
+    const { entries } = await load('recent', { auth: 'secret', database_id: 'recent', baseUrl });
+
+    assert.equal(queriesOf('recent').length, 0);
+    assert.deepEqual([...entries.keys()], ['a']);
+  });
+
+  test('falls back to the snapshot when Notion fails', async () => {
+    const syncedAt = new Date(Date.now() - HOUR).toISOString();
+    writeSnapshot('outage', syncedAt, [page('a', '2026-01-01T00:00:00.000Z')]);
+    databases.set('outage', () => ({ status: 500, json: { message: 'Internal error' } }));
+
+    const { entries, warnings } = await load('outage', { auth: 'secret', database_id: 'outage', baseUrl });
+
+    assert.equal(queriesOf('outage').length, 1);
+    assert.deepEqual([...entries.keys()], ['a']);
+    assert.equal(warnings.length, 1);
+    // The snapshot is left as it was
+    assert.equal(readSnapshot('outage').syncedAt, syncedAt);
+  });
+
+  test('fails when Notion fails and there is no snapshot', async () => {
+    databases.set('outage-first', () => ({ status: 500, json: { message: 'Internal error' } }));
+
+    await assert.rejects(load('outage-first', { auth: 'secret', database_id: 'outage-first', baseUrl }), /500/);
+    assert.equal(existsSync(join(cacheDir, 'notion', 'outage-first.json')), false);
+  });
+
+  test('loads offline builds from the snapshot only', async () => {
+    writeSnapshot('offline', new Date(Date.now() - 30 * DAY).toISOString(), [page('a', '2026-01-01T00:00:00.000Z')]);
+    databases.set('offline', () => ({ json: { results: [], has_more: false, next_cursor: null } }));
+
+    const { entries } = await load('offline', { auth: 'secret', database_id: 'offline', baseUrl, offline: true });
+
+    assert.equal(queriesOf('offline').length, 0);
+    assert.deepEqual([...entries.keys()], ['a']);
+  });
+
+  test('fails offline builds without a snapshot', async () => {
+    await assert.rejects(load('offline-first', { auth: 'secret', database_id: 'offline-first', baseUrl, offline: true }), /No Notion snapshot for offline-first/);
+    assert.equal(queriesOf('offline-first').length, 0);
+  });
+});
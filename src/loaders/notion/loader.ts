@@ -0,0 +1,194 @@
+import { existsSync, mkdirSync, readFileSync, writeFileSync } from 'node:fs';
+import { dirname, join } from 'node:path';
+import type { Loader } from 'astro/loaders';
+import { CACHE_DIR } from '../../utils/cache-dir';
+import { countMetric, recordPhase } from '../../utils/build-metrics';
+
+export interface NotionSnapshotLoaderOptions {
+  auth?: string;
+  database_id?: string;
+  // Build from the local snapshot only, without calling Notion (offline / CI)
+  offline?: boolean;
+  // Use the snapshot without querying Notion when it is younger than this
+  maxAge?: number;
+  // Re-query the whole database after this delay, to drop pages removed from it
+  fullSyncInterval?: number;
+  // Notion API origin, overridable to point at a local mock server
+  baseUrl?: string;
+}
+
+interface NotionPage {
+  id: string;
+  last_edited_time: string;
+  archived?: boolean;
+  in_trash?: boolean;
+  [key: string]: unknown;
+}
+
+interface NotionSnapshot {
+  version: number;
+  syncedAt?: string;
+  pages: Record<string, NotionPage>;
+}
+
+interface NotionQueryResponse {
+  results: NotionPage[];
+  has_more: boolean;
+  next_cursor: string | null;
+}
+
+const SNAPSHOT_VERSION = 1;
+const SNAPSHOT_DIR = join(CACHE_DIR, 'notion');
+
+const NOTION_VERSION = '2022-06-28';
+const DEFAULT_BASE_URL = 'https://api.notion.com';
+
+// Back-to-back dev restarts and builds reuse the snapshot as-is
+const DEFAULT_MAX_AGE = 10 * 60 * 1000;
+
+// Full sync once a day
+const DEFAULT_FULL_SYNC_INTERVAL = 24 * 60 * 60 * 1000;
+
+// Notion rounds last_edited_time down to the minute, so look back a little further
+const EDIT_TIME_MARGIN = 2 * 60 * 1000;
+
+function snapshotPath(collection: string): string {
+  return join(SNAPSHOT_DIR, `${collection}.json`);
+}
+
+function loadSnapshot(collection: string): NotionSnapshot | undefined {
+  try {
+    const path = snapshotPath(collection);
+    if (existsSync(path)) {
+      const snapshot: NotionSnapshot = JSON.parse(readFileSync(path, 'utf-8'));
+      if (snapshot.version === SNAPSHOT_VERSION) {
+        return snapshot;
+      }
+    }
+  } catch (error) {
+    console.warn(`Failed to load Notion snapshot for ${collection}:`, error);
+  }
+  return undefined;
+}
+
+function saveSnapshot(collection: string, snapshot: NotionSnapshot): void {
+  try {
+    const path = snapshotPath(collection);
+    mkdirSync(dirname(path), { recursive: true });
+    writeFileSync(path, JSON.stringify(snapshot, null, 2), 'utf-8');
+  } catch (error) {
+    console.warn(`Failed to save Notion snapshot for ${collection}:`, error);
+  }
+}
+
+async function queryDatabase(baseUrl: string, auth: string, databaseId: string, filter?: object): Promise<NotionPage[]> {
+  const pages: NotionPage[] = [];
+  let cursor: string | undefined;
+
+  do {
+    const response = await fetch(`${baseUrl}/v1/databases/${databaseId}/query`, {
+      method: 'POST',
+      headers: {
+        Authorization: `Bearer ${auth}`,
+        'Notion-Version': NOTION_VERSION,
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ page_size: 100, start_cursor: cursor, filter }),
+      signal: AbortSignal.timeout(30000), // 30 second timeout
+    });
+
+    if (!response.ok) {
+      throw new Error(`Notion query failed for ${databaseId}: ${response.status} ${await response.text()}`);
+    }
+
+    const { results, has_more, next_cursor }: NotionQueryResponse = await response.json();
+    pages.push(...results);
+    cursor = has_more && next_cursor ? next_cursor : undefined;
+  } while (cursor);
+
+  return pages;
+}
+
+async function syncSnapshot(
+  snapshot: NotionSnapshot | undefined,
+  { auth, database_id, baseUrl, fullSyncInterval }: Required<Pick<NotionSnapshotLoaderOptions, 'auth' | 'database_id' | 'baseUrl' | 'fullSyncInterval'>>,
+): Promise<{ snapshot: NotionSnapshot; changed: number; incremental: boolean }> {
+  const startedAt = new Date();
+  const lastSync = snapshot?.syncedAt ? new Date(snapshot.syncedAt).getTime() : undefined;
+  const since = lastSync !== undefined && startedAt.getTime() - lastSync < fullSyncInterval ? lastSync - EDIT_TIME_MARGIN : undefined;
+
+  // Incremental sync only asks for pages edited since the previous sync
+  const filter = since !== undefined ? { timestamp: 'last_edited_time', last_edited_time: { on_or_after: new Date(since).toISOString() } } : undefined;
+  const results = await queryDatabase(baseUrl, auth, database_id, filter);
+
+  const incremental = since !== undefined && snapshot !== undefined;
+  const pages: Record<string, NotionPage> = incremental ? { ...snapshot.pages } : {};
+  for (const page of results) {
+    if (page.archived || page.in_trash) {
+      delete pages[page.id];
+    } else {
+      pages[page.id] = page;
+    }
+  }
+
+  return { snapshot: { version: SNAPSHOT_VERSION, syncedAt: startedAt.toISOString(), pages }, changed: results.length, incremental };
+}
+
+/**
+ * Notion database loader backed by a local snapshot. Online builds only pull
+ * pages edited since the last sync; offline builds (or a Notion outage) are
+ * served entirely from the snapshot.
+ */
+export function notionSnapshotLoader({
+  auth,
+  database_id,
+  offline = false,
+  maxAge = DEFAULT_MAX_AGE,
+  fullSyncInterval = DEFAULT_FULL_SYNC_INTERVAL,
+  baseUrl = DEFAULT_BASE_URL,
+}: NotionSnapshotLoaderOptions): Loader {
+  return {
+    name: 'notion-snapshot-loader',
+    load: async ({ collection, store, logger, parseData }) => {
+      const loadStartedAt = performance.now();
+      let snapshot = loadSnapshot(collection);
+
+      if (offline || !auth || !database_id) {
+        if (!snapshot) {
+          throw new Error(`No Notion snapshot for ${collection}: run an online build first`);
+        }
+        logger.info(`Loading ${collection} from snapshot synced at ${snapshot.syncedAt}`);
+      } else if (snapshot?.syncedAt && Date.now() - new Date(snapshot.syncedAt).getTime() < maxAge) {
+        logger.info(`Loading ${collection} from recent snapshot synced at ${snapshot.syncedAt}`);
+      } else {
+        try {
+          const startedAt = performance.now();
+          const result = await syncSnapshot(snapshot, { auth, database_id, baseUrl, fullSyncInterval });
+          countMetric('notion.syncs');
+          snapshot = result.snapshot;
+          saveSnapshot(collection, snapshot);
+          logger.info(
+            `${result.incremental ? 'Incremental' : 'Full'} sync of ${collection}: ${result.changed} changed page(s) in ${Math.round(performance.now() - startedAt)}ms`,
+          );
+        } catch (error) {
+          if (!snapshot) throw error;
+          logger.warn(`Notion unavailable, loading ${collection} from snapshot synced at ${snapshot.syncedAt}: ${error}`);
+        }
+      }
+
+      const pages = snapshot.pages;
+      for (const id of store.keys()) {
+        if (!(id in pages)) store.delete(id);
+      }
+
+      for (const page of Object.values(pages)) {
+        // Unchanged pages are already in the data store
+        if (store.get(page.id)?.digest === page.last_edited_time) continue;
+        const data = await parseData({ id: page.id, data: page });
+        store.set({ id: page.id, data, digest: page.last_edited_time });
+      }
+
+      recordPhase(`notion:${collection}`, performance.now() - loadStartedAt);
+    },
+  };
+}
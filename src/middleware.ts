@@ -0,0 +1,19 @@
+import { defineMiddleware } from 'astro:middleware';
+import { recordPageRender } from './utils/build-metrics';
+
+/**
+ * Time every prerendered route for the build report. The body is read here
+ * so streamed pages are timed until their last chunk is rendered.
+ */
+export const onRequest = defineMiddleware(async (context, next) => {
+  if (!import.meta.env.PROD) {
+    return next();
+  }
+
+  const startedAt = performance.now();
+  const response = await next();
+  const body = await response.arrayBuffer();
+  recordPageRender(context.url.pathname, performance.now() - startedAt);
+
+  return new Response(body, response);
+});
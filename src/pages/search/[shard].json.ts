@@ -0,0 +1,14 @@
+import type { APIRoute, GetStaticPaths } from 'astro';
+import { getSearchIndex } from '../../content/search';
+
+export const getStaticPaths = (async () => {
+  const { shards } = await getSearchIndex();
+  return Object.keys(shards).map((shard) => ({ params: { shard } }));
+}) satisfies GetStaticPaths;
+
+export const GET: APIRoute = async ({ params }) => {
+  const { shards } = await getSearchIndex();
+  return new Response(JSON.stringify(shards[params.shard!]), {
+    headers: { 'Content-Type': 'application/json' },
+  });
+};
@@ -0,0 +1,10 @@
+import type { APIRoute } from 'astro';
+import { getSearchIndex } from '../../content/search';
+import { toSearchManifest } from '../../utils/search-index';
+
+// Document list and available shards, fetched by the search client on first use
+export const GET: APIRoute = async () => {
+  return new Response(JSON.stringify(toSearchManifest(await getSearchIndex())), {
+    headers: { 'Content-Type': 'application/json' },
+  });
+};
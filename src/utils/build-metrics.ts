@@ -0,0 +1,57 @@
+export interface PhaseTiming {
+  name: string;
+  durationMs: number;
+}
+
+export interface PageTiming {
+  route: string;
+  durationMs: number;
+}
+
+export interface BuildMetrics {
+  // Phases in the order they completed; a phase recorded twice is summed
+  phases: PhaseTiming[];
+  pages: PageTiming[];
+  counters: Record<string, number>;
+}
+
+// Loaders, pages and integrations record into the same registry although the
+// build loads them as separate module instances.
+const STATE_KEY = Symbol.for('website.build-metrics.state');
+const state = ((globalThis as Record<symbol, unknown>)[STATE_KEY] ??= {
+  phases: new Map(),
+  pages: [],
+  counters: {},
+}) as { phases: Map<string, number>; pages: PageTiming[]; counters: Record<string, number> };
+
+export function countMetric(name: string, by = 1): void {
+  state.counters[name] = (state.counters[name] ?? 0) + by;
+}
+
+export function recordPhase(name: string, durationMs: number): void {
+  state.phases.set(name, (state.phases.get(name) ?? 0) + durationMs);
+}
+
+export function recordPageRender(route: string, durationMs: number): void {
+  state.pages.push({ route, durationMs });
+}
+
+/**
+ * Time an async task as a build phase, whether it resolves or throws.
+ */
+export async function measurePhase<T>(name: string, task: () => Promise<T>): Promise<T> {
+  const startedAt = performance.now();
+  try {
+    return await task();
+  } finally {
+    recordPhase(name, performance.now() - startedAt);
+  }
+}
+
+export function getBuildMetrics(): BuildMetrics {
+  return {
+    phases: [...state.phases].map(([name, durationMs]) => ({ name, durationMs })),
+    pages: [...state.pages],
+    counters: { ...state.counters },
+  };
+}
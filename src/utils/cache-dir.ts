@@ -0,0 +1,5 @@
+import { join, resolve } from 'node:path';
+
+// Root of every build cache. The build benchmark points CACHE_DIR elsewhere
+// so synthetic runs never touch the real caches.
+export const CACHE_DIR = process.env.CACHE_DIR ? resolve(process.env.CACHE_DIR) : join(process.cwd(), '.cache');
@@ -0,0 +1,62 @@
+import assert from 'node:assert/strict';
+import { describe, test } from 'node:test';
+import { buildContentGraph, type ContentCollections } from './content-graph';
+
+const NOW = Date.UTC(2026, 0, 1);
+const DAY = 24 * 60 * 60 * 1000;
+
+function talk(id: string, conference: string[], cfp: string[]) {
+  return {
+    id,
+    collection: 'talks',
+    data: {
+      properties: {
+        conference: { relation: conference.map((relationId) => ({ id: relationId })) },
+        talk: { relation: cfp.map((relationId) => ({ id: relationId })) },
+      },
+    },
+  };
+}
+
+// Shapes match the collections' data; the content types themselves only exist inside Astro
+const collections = {
+  posts: [
+    { id: 'published', collection: 'posts', data: { title: 'Published', publishedAt: new Date(NOW - 10 * DAY), draft: false } },
+    { id: 'draft', collection: 'posts', data: { title: 'Draft', publishedAt: new Date(NOW - 5 * DAY), draft: true } },
+  ],
+  talks: [
+    talk('resolved', ['conference'], ['cfp']),
+    talk('no-conference', [], ['cfp']),
+    talk('no-cfp', ['conference'], []),
+    talk('missing-conference', ['deleted'], ['cfp']),
+  ],
+  conferences: [
+    { id: 'conference', collection: 'conferences', data: { properties: { name: 'Conf', date: { date: { start: new Date(NOW - DAY).toISOString() } } } } },
+  ],
+  cfps: [{ id: 'cfp', collection: 'cfps', data: { properties: { talk: 'A talk' } } }],
+} as unknown as ContentCollections;
+
+describe('content graph', () => {
+  test('leaves talks with empty or dangling relations out of the timeline', () => {
+    const graph = buildContentGraph(collections, NOW);
+
+    assert.deepEqual(
+      graph.talks.map(({ id }) => id),
+      ['resolved'],
+    );
+    assert.deepEqual(
+      graph.unresolvedTalks.map(({ id }) => id),
+      ['no-conference', 'no-cfp', 'missing-conference'],
+    );
+    assert.deepEqual(
+      graph.timeline.map(({ id }) => id),
+      ['resolved', 'published'],
+    );
+  });
+
+  test('joins both relations of resolved talks', () => {
+    const [joined] = buildContentGraph(collections, NOW).talks;
+    assert.equal(joined.data.properties.conference.name, 'Conf');
+    assert.equal(joined.data.properties.talk.talk, 'A talk');
+  });
+});
@@ -0,0 +1,118 @@
+import type { CollectionEntry } from 'astro:content';
+
+export type PostEntry = CollectionEntry<'posts'>;
+export type TalkEntry = CollectionEntry<'talks'>;
+export type ConferenceEntry = CollectionEntry<'conferences'>;
+export type CfpEntry = CollectionEntry<'cfps'>;
+
+type TalkProperties = TalkEntry['data']['properties'];
+
+// A talk with its conference and CFP relations replaced by their properties
+export type JoinedTalkEntry = Omit<TalkEntry, 'data'> & {
+  data: Omit<TalkEntry['data'], 'properties'> & {
+    properties: Omit<TalkProperties, 'conference' | 'talk'> & {
+      conference: ConferenceEntry['data']['properties'];
+      talk: CfpEntry['data']['properties'];
+    };
+  };
+};
+
+export type TimelineEntry = PostEntry | JoinedTalkEntry;
+
+export interface ContentCollections {
+  posts: PostEntry[];
+  talks: TalkEntry[];
+  conferences: ConferenceEntry[];
+  cfps: CfpEntry[];
+}
+
+export interface ContentGraph {
+  // Published posts, most recent first
+  posts: PostEntry[];
+  talks: JoinedTalkEntry[];
+  // Talks whose conference or CFP relation is empty or points to a missing page, left out of talks and timeline
+  unresolvedTalks: TalkEntry[];
+  conferencesById: Map<string, ConferenceEntry>;
+  cfpsById: Map<string, CfpEntry>;
+  // Posts and talks: past content most recent first, then upcoming content
+  timeline: TimelineEntry[];
+}
+
+function indexById<T extends { id: string }>(entries: T[]): Map<string, T> {
+  return new Map(entries.map((entry) => [entry.id, entry]));
+}
+
+function toTime(date: unknown): number {
+  const time = date ? new Date(date as string | Date).getTime() : NaN;
+  return Number.isNaN(time) ? 0 : time;
+}
+
+function getTime(entry: TimelineEntry): number {
+  if (entry.collection === 'talks') {
+    return toTime((entry.data.properties.conference.date as { date?: { start?: string } } | undefined)?.date?.start);
+  }
+  return toTime(entry.data.publishedAt);
+}
+
+// Pushes future-scheduled content after everything published (timestamps stay far below it)
+const FUTURE_OFFSET = Number.MAX_SAFE_INTEGER / 2;
+
+// Sort once on precomputed keys instead of recomputing dates in the comparator
+function sortByKey<T>(entries: T[], key: (entry: T) => number): T[] {
+  return entries
+    .map((entry) => ({ entry, key: key(entry) }))
+    .sort((a, b) => a.key - b.key)
+    .map(({ entry }) => entry);
+}
+
+export function buildContentGraph({ posts, talks, conferences, cfps }: ContentCollections, now = Date.now()): ContentGraph {
+  const conferencesById = indexById(conferences);
+  const cfpsById = indexById(cfps);
+
+  const joinedTalks: JoinedTalkEntry[] = [];
+  const unresolvedTalks: TalkEntry[] = [];
+  for (const talk of talks) {
+    const conference = conferencesById.get(talk.data.properties.conference.relation[0]?.id)?.data?.properties;
+    const cfp = cfpsById.get(talk.data.properties.talk.relation[0]?.id)?.data?.properties;
+    if (!conference || !cfp) {
+      unresolvedTalks.push(talk);
+      continue;
+    }
+    joinedTalks.push({ ...talk, data: { ...talk.data, properties: { ...talk.data.properties, conference, talk: cfp } } });
+  }
+
+  const publishedPosts = posts.filter(({ data }) => !data.draft);
+
+  return {
+    posts: sortByKey(publishedPosts, (post) => -toTime(post.data.publishedAt)),
+    talks: joinedTalks,
+    unresolvedTalks,
+    conferencesById,
+    cfpsById,
+    // Published content comes before future-scheduled one, each group most recent first
+    timeline: sortByKey<TimelineEntry>([...publishedPosts, ...joinedTalks], (entry) => {
+      const time = getTime(entry);
+      return time > now ? FUTURE_OFFSET - time : -time;
+    }),
+  };
+}
+
+const masonryCache = new WeakMap<object[], Map<number, unknown[][]>>();
+
+export function groupContentsForMasonry<T>(contents: T[], columns: number): T[][] {
+  let byColumns = masonryCache.get(contents);
+  if (!byColumns) {
+    byColumns = new Map();
+    masonryCache.set(contents, byColumns);
+  }
+
+  let grouped = byColumns.get(columns) as T[][] | undefined;
+  if (!grouped) {
+    grouped = Array.from({ length: columns }, () => []) as T[][];
+    contents.forEach((content, index) => {
+      grouped![index % columns].push(content);
+    });
+    byColumns.set(columns, grouped);
+  }
+  return grouped;
+}
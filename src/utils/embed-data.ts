@@ -0,0 +1,160 @@
+import { existsSync, mkdirSync, readFileSync, writeFileSync } from 'node:fs';
+import { dirname, join } from 'node:path';
+import { CACHE_DIR } from './cache-dir';
+import { countMetric } from './build-metrics';
+
+export interface TweetEmbed {
+  html: string;
+  authorName: string;
+  url: string;
+}
+
+export interface GistFile {
+  filename: string;
+  language: string;
+  content: string;
+}
+
+export interface GistEmbed {
+  url: string;
+  files: GistFile[];
+}
+
+type EmbedCache = Record<string, { fetchedAt: string; value: unknown }>;
+
+// Build-time data of third-party embeds (tweet text, gist sources)
+const CACHE_PATH = join(CACHE_DIR, 'embeds.json');
+
+// Cache duration in milliseconds (30 days)
+const CACHE_DURATION = 30 * 24 * 60 * 60 * 1000;
+
+// Delay before new entries are written back to disk
+const FLUSH_DELAY = 1000;
+
+const POSTERS_DIR = join(process.cwd(), 'public', 'embeds', 'youtube');
+
+// Shared by every module instance of the build, like the OG cache
+const STATE_KEY = Symbol.for('website.embed-data.state');
+const state = ((globalThis as Record<symbol, unknown>)[STATE_KEY] ??= {
+  cache: null,
+  inFlight: new Map(),
+  flushTimer: null,
+}) as { cache: EmbedCache | null; inFlight: Map<string, Promise<unknown>>; flushTimer: ReturnType<typeof setTimeout> | null };
+
+function loadCache(): EmbedCache {
+  try {
+    if (existsSync(CACHE_PATH)) {
+      return JSON.parse(readFileSync(CACHE_PATH, 'utf-8'));
+    }
+  } catch (error) {
+    console.warn('Failed to load embed cache:', error);
+  }
+  return {};
+}
+
+function saveCache(): void {
+  state.flushTimer = null;
+  try {
+    mkdirSync(dirname(CACHE_PATH), { recursive: true });
+    writeFileSync(CACHE_PATH, JSON.stringify(state.cache, null, 2), 'utf-8');
+  } catch (error) {
+    console.warn('Failed to save embed cache:', error);
+  }
+}
+
+// Concurrent calls for the same key share a single request
+function dedupe<T>(key: string, fn: () => Promise<T>): Promise<T> {
+  let pending = state.inFlight.get(key) as Promise<T> | undefined;
+  if (!pending) {
+    pending = fn().finally(() => state.inFlight.delete(key));
+    state.inFlight.set(key, pending);
+  }
+  return pending;
+}
+
+/**
+ * Return the cached value for `key`, or fetch it once no matter how many
+ * embeds ask for it. Failed fetches (undefined) are not cached.
+ */
+function cached<T>(key: string, fetcher: () => Promise<T | undefined>): Promise<T | undefined> {
+  const cache = (state.cache ??= loadCache());
+  const entry = cache[key];
+  if (entry && Date.now() - new Date(entry.fetchedAt).getTime() < CACHE_DURATION) {
+    return Promise.resolve(entry.value as T);
+  }
+
+  return dedupe(key, () =>
+    fetcher()
+      .catch((error) => {
+        console.warn(`Failed to fetch embed data for ${key}:`, error);
+        return undefined;
+      })
+      .then((value) => {
+        if (value !== undefined) {
+          cache[key] = { fetchedAt: new Date().toISOString(), value };
+          state.flushTimer ??= setTimeout(saveCache, FLUSH_DELAY);
+        }
+        return value;
+      }),
+  );
+}
+
+async function fetchJson<T>(url: string): Promise<T> {
+  countMetric('embeds.requests');
+  const response = await fetch(url, { signal: AbortSignal.timeout(10000) });
+  if (!response.ok) {
+    throw new Error(`${response.status} ${response.statusText}`);
+  }
+  return response.json();
+}
+
+export function getTweetEmbed(id: string): Promise<TweetEmbed | undefined> {
+  return cached(`tweet:${id}`, async () => {
+    const url = `https://twitter.com/x/status/${id}`;
+    const { html, author_name } = await fetchJson<{ html: string; author_name: string }>(
+      `https://publish.twitter.com/oembed?url=${encodeURIComponent(url)}&omit_script=true&dnt=true&theme=dark`,
+    );
+    return { html, authorName: author_name, url };
+  });
+}
+
+export function getGistEmbed(id: string): Promise<GistEmbed | undefined> {
+  // Accept both "user/hash" and "hash"
+  const hash = id.split('/').pop()!;
+  return cached(`gist:${hash}`, async () => {
+    const { html_url, files } = await fetchJson<{ html_url: string; files: Record<string, { filename: string; language: string | null; content: string }> }>(
+      `https://api.github.com/gists/${hash}`,
+    );
+    return {
+      url: html_url,
+      files: Object.values(files).map(({ filename, language, content }) => ({ filename, language: language?.toLowerCase() ?? 'plaintext', content })),
+    };
+  });
+}
+
+/**
+ * Download the video thumbnail into public/ once, so the facade poster is
+ * served from our own origin.
+ */
+export async function getYouTubePoster(id: string): Promise<string> {
+  const remote = `https://i.ytimg.com/vi/${id}/hqdefault.jpg`;
+  const filename = `${id}.jpg`;
+  const localPath = join(POSTERS_DIR, filename);
+  const publicPath = `/embeds/youtube/${filename}`;
+
+  if (existsSync(localPath)) {
+    return publicPath;
+  }
+
+  return dedupe(`youtube:${id}`, async () => {
+    countMetric('embeds.requests');
+    const response = await fetch(remote, { signal: AbortSignal.timeout(10000) });
+    if (!response.ok) throw new Error(`${response.status} ${response.statusText}`);
+    mkdirSync(POSTERS_DIR, { recursive: true });
+    writeFileSync(localPath, Buffer.from(await response.arrayBuffer()));
+    return publicPath;
+  }).catch((error) => {
+    console.warn(`Failed to download YouTube poster ${id}:`, error);
+    return remote;
+  });
+}
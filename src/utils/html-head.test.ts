@@ -0,0 +1,57 @@
+import assert from 'node:assert/strict';
+import { readFileSync } from 'node:fs';
+import { join } from 'node:path';
+import { describe, test } from 'node:test';
+import { HeadTokenizer, parseHtmlHead, readHtmlHead } from './html-head';
+
+const FIXTURES_DIR = join(process.cwd(), 'scripts', 'fixtures', 'og-html');
+
+function toStream(html: string, chunkSize: number): ReadableStream<Uint8Array> {
+  const bytes = new TextEncoder().encode(html);
+  let offset = 0;
+  return new ReadableStream({
+    pull(controller) {
+      if (offset >= bytes.length) {
+        controller.close();
+        return;
+      }
+      controller.enqueue(bytes.subarray(offset, offset + chunkSize));
+      offset += chunkSize;
+    },
+  });
+}
+
+describe('html-head', () => {
+  test('keeps quoted attribute values containing ">"', () => {
+    const head = parseHtmlHead(`<head><meta property="og:description" content="x -> y"><meta name='note' content='a > b'></head>`);
+    assert.equal(head.meta['og:description'], 'x -> y');
+    assert.equal(head.meta.note, 'a > b');
+    assert.equal(head.complete, true);
+  });
+
+  test('waits for a tag cut inside a quoted value', () => {
+    const tokenizer = new HeadTokenizer();
+    assert.equal(tokenizer.write('<head><meta property="og:title" content="build -'), false);
+    assert.equal(tokenizer.write('> test"><title>Pipelines</title></head>'), true);
+    assert.equal(tokenizer.head.meta['og:title'], 'build -> test');
+    assert.equal(tokenizer.head.title, 'Pipelines');
+  });
+
+  test('skips stray "<" in text', () => {
+    const head = parseHtmlHead('<head><title>a < b</title><meta name="description" content="ok"></head>');
+    assert.equal(head.title, 'a < b');
+    assert.equal(head.meta.description, 'ok');
+  });
+
+  test('reads the arrow fixture the same whatever the chunk size', async () => {
+    const html = readFileSync(join(FIXTURES_DIR, 'arrow-description.html'), 'utf-8');
+    for (const chunkSize of [1, 7, 64, html.length]) {
+      const head = await readHtmlHead(toStream(html, chunkSize));
+      assert.equal(head.meta['og:title'], 'Task pipelines -> faster CI');
+      assert.equal(head.meta['og:description'], 'build -> test -> deploy: how dependsOn orders targets when a > b');
+      assert.equal(head.meta.description, 'Targets run once their dependencies (a -> b) are done');
+      assert.deepEqual(head.links, [{ rel: 'icon', href: '/favicon.svg' }]);
+      assert.equal(head.complete, true);
+    }
+  });
+});
@@ -0,0 +1,177 @@
+export interface HtmlLink {
+  rel: string;
+  href: string;
+}
+
+export interface HtmlHead {
+  title?: string;
+  // Meta content keyed by lowercased `property` or `name`, first occurrence wins
+  meta: Record<string, string>;
+  links: HtmlLink[];
+  bytesRead: number;
+  // False when the byte cap was hit or the stream ended before </head>
+  complete: boolean;
+}
+
+// Enough for the <head> of any real page; documentation sites rarely exceed 100 KB
+const DEFAULT_MAX_BYTES = 256 * 1024;
+
+// Compiled once and reused for every document. Quoted attribute values may contain '>'
+const TAG_PATTERN = /<(\/?)([a-zA-Z][\w:-]*)((?:[^>"']|"[^"]*"|'[^']*')*)>/g;
+// A tag cut by the end of the buffer, possibly inside a quoted value
+const PARTIAL_TAG_PATTERN = /^<\/?(?:[a-zA-Z][\w:-]*(?:[^>"']|"[^"]*"|'[^']*')*(?:"[^"]*|'[^']*)?)?$/;
+const ATTRIBUTE_PATTERN = /([^\s=/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?/g;
+
+// Elements whose content is not markup and must be skipped as a whole
+const RAW_TEXT_TAGS = new Set(['script', 'style', 'noscript', 'template']);
+
+function parseAttributes(source: string): Record<string, string> {
+  const attributes: Record<string, string> = {};
+  for (const match of source.matchAll(ATTRIBUTE_PATTERN)) {
+    const name = match[1].toLowerCase();
+    if (!(name in attributes)) {
+      attributes[name] = match[2] ?? match[3] ?? match[4] ?? '';
+    }
+  }
+  return attributes;
+}
+
+/**
+ * Incremental tokenizer collecting <title>, <meta> and <link> tags from the
+ * document head. Feed it decoded chunks with `write()` until it reports done.
+ */
+export class HeadTokenizer {
+  private buffer = '';
+  private titleStart: number | null = null;
+  private skipUntil: string | null = null;
+  private done = false;
+  readonly head: HtmlHead = { meta: {}, links: [], bytesRead: 0, complete: false };
+
+  write(chunk: string): boolean {
+    if (this.done) return true;
+    this.buffer += chunk;
+
+    let position = 0;
+    while (position < this.buffer.length) {
+      // Inside a comment or raw text element: jump straight to its end
+      if (this.skipUntil) {
+        const end = this.buffer.slice(position).toLowerCase().indexOf(this.skipUntil);
+        if (end === -1) {
+          // Only keep enough to match a terminator split across chunks
+          position = Math.max(position, this.buffer.length - this.skipUntil.length + 1);
+          break;
+        }
+        position += end + this.skipUntil.length;
+        this.skipUntil = null;
+        continue;
+      }
+
+      const start = this.buffer.indexOf('<', position);
+      if (start === -1) {
+        position = this.buffer.length;
+        break;
+      }
+
+      if (this.buffer.startsWith('<!--', start)) {
+        this.skipUntil = '-->';
+        position = start + 4;
+        continue;
+      }
+
+      TAG_PATTERN.lastIndex = start;
+      const match = TAG_PATTERN.exec(this.buffer);
+      if (!match || match.index !== start) {
+        // Either an incomplete tag (wait for more data) or a stray '<'
+        if (PARTIAL_TAG_PATTERN.test(this.buffer.slice(start))) {
+          position = start;
+          break;
+        }
+        position = start + 1;
+        continue;
+      }
+
+      position = start + match[0].length;
+      if (this.handleTag(match[1] === '/', match[2].toLowerCase(), match[3], start, position)) {
+        this.done = true;
+        this.head.complete = true;
+        return true;
+      }
+    }
+
+    // Drop what has been consumed, keeping an unfinished title or tag
+    const keepFrom = this.titleStart ?? position;
+    this.buffer = this.buffer.slice(keepFrom);
+    if (this.titleStart !== null) {
+      this.titleStart = 0;
+    }
+    return false;
+  }
+
+  private handleTag(closing: boolean, name: string, attributeSource: string, start: number, end: number): boolean {
+    if (closing) {
+      if (name === 'title' && this.titleStart !== null) {
+        this.head.title ??= this.buffer.slice(this.titleStart, start);
+        this.titleStart = null;
+      }
+      return name === 'head';
+    }
+
+    switch (name) {
+      case 'body':
+        return true;
+      case 'title':
+        this.titleStart = end;
+        break;
+      case 'meta': {
+        const attributes = parseAttributes(attributeSource);
+        const key = (attributes.property ?? attributes.name)?.toLowerCase();
+        if (key && attributes.content !== undefined && !(key in this.head.meta)) {
+          this.head.meta[key] = attributes.content;
+        }
+        break;
+      }
+      case 'link': {
+        const attributes = parseAttributes(attributeSource);
+        if (attributes.rel && attributes.href) {
+          this.head.links.push({ rel: attributes.rel.toLowerCase(), href: attributes.href });
+        }
+        break;
+      }
+      default:
+        if (RAW_TEXT_TAGS.has(name) && !attributeSource.trimEnd().endsWith('/')) {
+          this.skipUntil = `</${name}`;
+        }
+    }
+    return false;
+  }
+}
+
+/**
+ * Read a response body until </head> (or `maxBytes`) and cancel the rest of
+ * the download.
+ */
+export async function readHtmlHead(body: ReadableStream<Uint8Array>, maxBytes = DEFAULT_MAX_BYTES): Promise<HtmlHead> {
+  const tokenizer = new HeadTokenizer();
+  const decoder = new TextDecoder();
+  const reader = body.getReader();
+
+  try {
+    while (tokenizer.head.bytesRead < maxBytes) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      tokenizer.head.bytesRead += value.byteLength;
+      if (tokenizer.write(decoder.decode(value, { stream: true }))) break;
+    }
+  } finally {
+    reader.cancel().catch(() => {});
+  }
+
+  return tokenizer.head;
+}
+
+export function parseHtmlHead(html: string): HtmlHead {
+  const tokenizer = new HeadTokenizer();
+  tokenizer.head.bytesRead = Buffer.byteLength(html);
+  tokenizer.write(html);
+  return tokenizer.head;
+}
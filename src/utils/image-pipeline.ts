@@ -0,0 +1,225 @@
+import { createHash } from 'node:crypto';
+import { cpSync, existsSync, mkdirSync, readdirSync, readFileSync, rmSync, statSync, writeFileSync } from 'node:fs';
+import { availableParallelism } from 'node:os';
+import { basename, dirname, extname, join, relative, resolve } from 'node:path';
+import { runPool } from './pool';
+import { CACHE_DIR } from './cache-dir';
+
+export type ImageFormat = 'avif' | 'webp';
+
+export interface ImageVariant {
+  src: string;
+  width: number;
+}
+
+export interface OptimizedImage {
+  hash: string;
+  width: number;
+  height: number;
+  // Source stat, used to skip re-hashing unchanged files
+  size: number;
+  mtimeMs: number;
+  // Widths the variants were requested at, so a new width list re-encodes unchanged sources
+  widths: number[];
+  variants: Record<ImageFormat, ImageVariant[]>;
+}
+
+type ImageManifest = Record<string, OptimizedImage>;
+
+export interface ImagePipelineOptions {
+  // Folders under public/ whose images are optimized
+  sourceDirs?: string[];
+  widths?: number[];
+  concurrency?: number;
+}
+
+export interface ImagePipelineReport {
+  total: number;
+  encoded: number;
+  cached: number;
+  failed: number;
+  variants: number;
+  durationMs: number;
+}
+
+const PUBLIC_DIR = join(process.cwd(), 'public');
+
+// Encoded variants are served from public/ so they work in dev and build alike.
+// The build benchmark points IMAGE_OUTPUT_DIR elsewhere, like CACHE_DIR; the
+// variants are then copied into the build output once pages are generated.
+const PUBLIC_OUTPUT_DIR = join(PUBLIC_DIR, '_img');
+const OUTPUT_DIR = process.env.IMAGE_OUTPUT_DIR ? resolve(process.env.IMAGE_OUTPUT_DIR) : PUBLIC_OUTPUT_DIR;
+const OUTPUT_URL = '/_img';
+
+const MANIFEST_PATH = join(CACHE_DIR, 'image-manifest.json');
+
+const DEFAULT_SOURCE_DIRS = ['blog/images', 'blog/covers'];
+const DEFAULT_WIDTHS = [480, 768, 1200, 1600];
+const FORMATS: ImageFormat[] = ['avif', 'webp'];
+const SUPPORTED_EXTENSIONS = new Set(['.png', '.jpg', '.jpeg', '.webp']);
+
+// The build loads this module from astro.config and from the bundled pages,
+// so the manifest lives on globalThis to be shared by both.
+const STATE_KEY = Symbol.for('website.image-pipeline.state');
+const state = ((globalThis as Record<symbol, unknown>)[STATE_KEY] ??= { manifest: null }) as { manifest: ImageManifest | null };
+
+function loadManifest(): ImageManifest {
+  try {
+    if (existsSync(MANIFEST_PATH)) {
+      return JSON.parse(readFileSync(MANIFEST_PATH, 'utf-8'));
+    }
+  } catch (error) {
+    console.warn('Failed to load image manifest:', error);
+  }
+  return {};
+}
+
+function saveManifest(manifest: ImageManifest): void {
+  try {
+    mkdirSync(dirname(MANIFEST_PATH), { recursive: true });
+    writeFileSync(MANIFEST_PATH, JSON.stringify(manifest, null, 2), 'utf-8');
+  } catch (error) {
+    console.warn('Failed to save image manifest:', error);
+  }
+}
+
+function getManifest(): ImageManifest {
+  if (!state.manifest) {
+    state.manifest = loadManifest();
+  }
+  return state.manifest;
+}
+
+function collectImages(sourceDirs: string[]): string[] {
+  return sourceDirs.flatMap((dir) => {
+    const absoluteDir = join(PUBLIC_DIR, dir);
+    if (!existsSync(absoluteDir)) return [];
+    return readdirSync(absoluteDir, { recursive: true, encoding: 'utf-8' })
+      .filter((file) => SUPPORTED_EXTENSIONS.has(extname(file).toLowerCase()))
+      .map((file) => `/${relative(PUBLIC_DIR, join(absoluteDir, file)).split('\\').join('/')}`);
+  });
+}
+
+function variantPath(hash: string, width: number, format: ImageFormat): string {
+  return `${hash}-${width}.${format}`;
+}
+
+function variantsExist({ variants }: OptimizedImage): boolean {
+  return FORMATS.every((format) => variants[format].every(({ src }) => existsSync(join(OUTPUT_DIR, basename(src)))));
+}
+
+function targetWidths(intrinsicWidth: number, widths: number[]): number[] {
+  const smaller = widths.filter((width) => width < intrinsicWidth);
+  return [...smaller, Math.min(intrinsicWidth, Math.max(...widths))];
+}
+
+async function encodeImage(source: Buffer, hash: string, widths: number[]): Promise<Pick<OptimizedImage, 'width' | 'height' | 'variants'>> {
+  const { default: sharp } = await import('sharp');
+  // One libvips thread per image: parallelism comes from the job pool instead
+  sharp.concurrency(1);
+
+  const { width = 0, height = 0 } = await sharp(source).metadata();
+  const variants: Record<ImageFormat, ImageVariant[]> = { avif: [], webp: [] };
+
+  for (const targetWidth of targetWidths(width, widths)) {
+    for (const format of FORMATS) {
+      const file = variantPath(hash, targetWidth, format);
+      const output = join(OUTPUT_DIR, file);
+      if (!existsSync(output)) {
+        await sharp(source).resize({ width: targetWidth, withoutEnlargement: true }).toFormat(format).toFile(output);
+      }
+      variants[format].push({ src: `${OUTPUT_URL}/${file}`, width: targetWidth });
+    }
+  }
+
+  return { width, height, variants };
+}
+
+/**
+ * Encode AVIF/WebP variants of every public blog image. Sources are keyed by
+ * content hash, so unchanged images are never re-encoded.
+ */
+export async function optimizeImages({
+  sourceDirs = DEFAULT_SOURCE_DIRS,
+  widths = DEFAULT_WIDTHS,
+  concurrency = availableParallelism(),
+}: ImagePipelineOptions = {}): Promise<ImagePipelineReport> {
+  const startedAt = performance.now();
+  const previous = getManifest();
+  const manifest: ImageManifest = {};
+  const report = { total: 0, encoded: 0, cached: 0, failed: 0, variants: 0 };
+
+  mkdirSync(OUTPUT_DIR, { recursive: true });
+  const images = collectImages(sourceDirs);
+  report.total = images.length;
+
+  await runPool(
+    images,
+    async (src) => {
+      const path = join(PUBLIC_DIR, src);
+      const { size, mtimeMs } = statSync(path);
+      const known = previous[src];
+
+      // Same stat, widths and variants still on disk: trust the previous hash without reading the file.
+      // Entries written before widths were stored have none, so they are re-hashed once.
+      if (known && known.size === size && known.mtimeMs === mtimeMs && known.widths?.join(',') === widths.join(',') && variantsExist(known)) {
+        manifest[src] = known;
+        report.cached++;
+        return;
+      }
+
+      const source = readFileSync(path);
+      const hash = createHash('sha256').update(source).update(widths.join(',')).digest('hex').slice(0, 16);
+      if (known?.hash === hash && variantsExist(known)) {
+        manifest[src] = { ...known, size, mtimeMs, widths };
+        report.cached++;
+        return;
+      }
+
+      try {
+        manifest[src] = { hash, size, mtimeMs, widths, ...(await encodeImage(source, hash, widths)) };
+        report.encoded++;
+      } catch (error) {
+        console.warn(`Failed to optimize ${src}:`, error);
+        report.failed++;
+      }
+    },
+    { concurrency },
+  );
+
+  // Remove variants no image points to anymore
+  const referenced = new Set(Object.values(manifest).flatMap(({ variants }) => FORMATS.flatMap((format) => variants[format].map(({ src }) => src))));
+  for (const file of readdirSync(OUTPUT_DIR)) {
+    if (!referenced.has(`${OUTPUT_URL}/${file}`)) {
+      rmSync(join(OUTPUT_DIR, file));
+    }
+  }
+
+  report.variants = referenced.size;
+  state.manifest = manifest;
+  saveManifest(manifest);
+
+  return { ...report, durationMs: performance.now() - startedAt };
+}
+
+/**
+ * Copy the variants into a build output folder when they are not written to
+ * public/, which Astro already copies.
+ */
+export function copyImageVariants(outDir: string): void {
+  if (OUTPUT_DIR !== PUBLIC_OUTPUT_DIR && existsSync(OUTPUT_DIR)) {
+    cpSync(OUTPUT_DIR, join(outDir, OUTPUT_URL), { recursive: true });
+  }
+}
+
+export function getOptimizedImage(src: string): OptimizedImage | undefined {
+  try {
+    return getManifest()[decodeURI(src)];
+  } catch {
+    return undefined;
+  }
+}
+
+export function toSrcset(variants: ImageVariant[]): string {
+  return variants.map(({ src, width }) => `${src} ${width}w`).join(', ');
+}
@@ -0,0 +1,196 @@
+import assert from 'node:assert/strict';
+import { mkdtempSync, readFileSync, writeFileSync } from 'node:fs';
+import { createServer, type IncomingHttpHeaders, type Server, type ServerResponse } from 'node:http';
+import type { AddressInfo } from 'node:net';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { after, afterEach, before, beforeEach, describe, mock, test } from 'node:test';
+import type { OgCacheEntry } from './og-metadata';
+
+// The cache folder is read when the module loads, so og-metadata is imported once it is set
+const cacheDir = mkdtempSync(join(tmpdir(), 'og-metadata-'));
+const cachePath = join(cacheDir, 'og-metadata.json');
+process.env.CACHE_DIR = cacheDir;
+
+const HOUR = 60 * 60 * 1000;
+const DAY = 24 * HOUR;
+
+const LEGACY_URL = 'https://legacy.example.com/post';
+
+let og: typeof import('./og-metadata');
+let server: Server;
+let baseUrl: string;
+
+// Per-path handlers of the stub server, and the headers of every request it received
+const routes = new Map<string, (response: ServerResponse, headers: IncomingHttpHeaders) => void>();
+const requests: { path: string; headers: IncomingHttpHeaders }[] = [];
+
+function page(title: string): string {
+  return `<!doctype html><html><head><title>${title}</title><meta property="og:title" content="${title}"><meta property="og:description" content="About ${title}"></head><body></body></html>`;
+}
+
+function readCacheFile(): { version: number; entries: Record<string, OgCacheEntry> } {
+  og.flushOgCache();
+  return JSON.parse(readFileSync(cachePath, 'utf-8'));
+}
+
+before(async () => {
+  // Layout written before entries were versioned: a flat map of metadata
+  writeFileSync(
+    cachePath,
+    JSON.stringify({ [LEGACY_URL]: { url: LEGACY_URL, title: 'Legacy post', description: 'Cached before v2', fetchedAt: new Date().toISOString() } }),
+  );
+
+  server = createServer((request, response) => {
+    const path = request.url ?? '/';
+    requests.push({ path, headers: request.headers });
+    const handler = routes.get(path);
+    if (handler) {
+      handler(response, request.headers);
+    } else {
+      response.writeHead(404).end();
+    }
+  });
+  await new Promise<void>((resolve) => server.listen(0, '127.0.0.1', resolve));
+  baseUrl = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+
+  og = await import('./og-metadata');
+  og.configureOgCache({ explicitFlush: true });
+});
+
+after(() => {
+  server.close();
+});
+
+beforeEach(() => {
+  mock.timers.enable({ apis: ['Date'], now: Date.now() });
+});
+
+afterEach(() => {
+  mock.timers.reset();
+  og.configureOgCache({ staleWhileRevalidate: false });
+});
+
+describe('og-metadata cache', () => {
+  // Runs first: the cache file is only read on the first lookup
+  test('migrates an unversioned cache file', async () => {
+    const legacy = await og.resolveOgMetadata(LEGACY_URL);
+    assert.equal(legacy.outcome, 'cached');
+    assert.equal(legacy.metadata.title, 'Legacy post');
+
+    routes.set('/migration', (response) => response.writeHead(200, { 'Content-Type': 'text/html' }).end(page('Migration')));
+    await og.resolveOgMetadata(`${baseUrl}/migration`);
+
+    const file = readCacheFile();
+    assert.equal(file.version, 2);
+    assert.equal(file.entries[LEGACY_URL].metadata.title, 'Legacy post');
+    assert.equal(file.entries[LEGACY_URL].etag, undefined);
+    assert.equal(file.entries[`${baseUrl}/migration`].metadata.title, 'Migration');
+  });
+
+  test('revalidates an expired entry with its validators and keeps it on 304', async () => {
+    const lastModified = new Date(Date.now() - DAY).toUTCString();
+    routes.set('/revalidated', (response, headers) => {
+      if (headers['if-none-match'] === '"v1"') {
+        response.writeHead(304, { ETag: '"v1"', 'Last-Modified': lastModified }).end();
+      } else {
+        response.writeHead(200, { 'Content-Type': 'text/html', ETag: '"v1"', 'Last-Modified': lastModified }).end(page('Revalidated'));
+      }
+    });
+    const url = `${baseUrl}/revalidated`;
+
+    const first = await og.resolveOgMetadata(url);
+    assert.equal(first.outcome, 'fetched');
+    assert.equal(first.metadata.title, 'Revalidated');
+    assert.equal((await og.resolveOgMetadata(url)).outcome, 'cached');
+
+    mock.timers.tick(8 * DAY);
+    const second = await og.resolveOgMetadata(url);
+    assert.equal(second.outcome, 'revalidated');
+    assert.equal(second.metadata.title, 'Revalidated');
+
+    const conditional = requests.filter(({ path }) => path === '/revalidated').at(-1)!;
+    assert.equal(conditional.headers['if-none-match'], '"v1"');
+    assert.equal(conditional.headers['if-modified-since'], lastModified);
+
+    // The 304 restarts the cache duration
+    assert.equal((await og.resolveOgMetadata(url)).outcome, 'cached');
+  });
+
+  test('serves stale entries while revalidating them in the background', async () => {
+    let title = 'Before';
+    routes.set('/stale', (response) => response.writeHead(200, { 'Content-Type': 'text/html' }).end(page(title)));
+    const url = `${baseUrl}/stale`;
+    og.configureOgCache({ staleWhileRevalidate: true });
+
+    await og.resolveOgMetadata(url);
+    title = 'After';
+    mock.timers.tick(8 * DAY);
+
+    const stale = await og.resolveOgMetadata(url);
+    assert.equal(stale.outcome, 'stale');
+    assert.equal(stale.metadata.title, 'Before');
+    assert.ok(stale.revalidation);
+
+    const refreshed = await stale.revalidation;
+    assert.equal(refreshed.outcome, 'fetched');
+    assert.equal(refreshed.metadata.title, 'After');
+
+    const cached = await og.resolveOgMetadata(url);
+    assert.equal(cached.outcome, 'cached');
+    assert.equal(cached.metadata.title, 'After');
+  });
+
+  test('backs off failed URLs from one hour, doubling up to seven days', async () => {
+    const url = `${baseUrl}/missing`;
+
+    for (let failures = 1; failures <= 10; failures++) {
+      const resolution = await og.resolveOgMetadata(url);
+      assert.equal(resolution.outcome, 'failed');
+
+      const entry = readCacheFile().entries[url];
+      const delay = new Date(entry.retryAt!).getTime() - Date.now();
+      assert.equal(entry.failures, failures);
+      assert.equal(delay, Math.min(HOUR * 2 ** (failures - 1), 7 * DAY));
+
+      // No request until the retry time
+      assert.equal((await og.resolveOgMetadata(url)).outcome, 'backoff');
+      mock.timers.tick(delay);
+    }
+
+    assert.equal(requests.filter(({ path }) => path === '/missing').length, 10);
+  });
+
+  test('keeps the last good metadata and validators through repeated failures', async () => {
+    let status = 200;
+    routes.set('/flaky', (response, headers) => {
+      if (status === 200) {
+        response.writeHead(200, { 'Content-Type': 'text/html', ETag: '"flaky"' }).end(page('Flaky'));
+      } else if (headers['if-none-match'] === '"flaky"' && status === 304) {
+        response.writeHead(304, { ETag: '"flaky"' }).end();
+      } else {
+        response.writeHead(status).end();
+      }
+    });
+    const url = `${baseUrl}/flaky`;
+
+    await og.resolveOgMetadata(url);
+    status = 503;
+    mock.timers.tick(8 * DAY);
+
+    for (let failures = 1; failures <= 2; failures++) {
+      const failed = await og.resolveOgMetadata(url);
+      assert.equal(failed.outcome, 'failed');
+      assert.equal(failed.metadata.title, 'Flaky');
+      assert.equal(readCacheFile().entries[url].etag, '"flaky"');
+      mock.timers.tick(HOUR * 2 ** (failures - 1));
+    }
+
+    status = 304;
+    const recovered = await og.resolveOgMetadata(url);
+    assert.equal(recovered.outcome, 'revalidated');
+    assert.equal(recovered.metadata.title, 'Flaky');
+    assert.equal(requests.filter(({ path }) => path === '/flaky').at(-1)!.headers['if-none-match'], '"flaky"');
+    assert.equal(readCacheFile().entries[url].failures, undefined);
+  });
+});
@@ -1,5 +1,8 @@
 import { readFileSync, writeFileSync, existsSync, mkdirSync } from 'node:fs';
 import { join, dirname } from 'node:path';
+import { readHtmlHead, type HtmlHead } from './html-head';
+import { CACHE_DIR } from './cache-dir';
+import { countMetric } from './build-metrics';
 
 export interface OgMetadata {
   url: string;
@@ -11,20 +14,91 @@ export interface OgMetadata {
   fetchedAt: string;
 }
 
-type OgCache = Record<string, OgMetadata>;
+export interface OgCacheEntry {
+  metadata: OgMetadata;
+  // Validators sent back on revalidation so unchanged pages answer 304
+  etag?: string;
+  lastModified?: string;
+  // Consecutive failed fetches, and when the next attempt is allowed
+  failures?: number;
+  retryAt?: string;
+}
+
+interface OgCacheFile {
+  version: number;
+  entries: Record<string, OgCacheEntry>;
+}
 
-// Cache file path - use process.cwd() to get the project root
-// This works during both dev and build because Astro runs from project root
-const CACHE_PATH = join(process.cwd(), '.cache', 'og-metadata.json');
+type OgCache = Record<string, OgCacheEntry>;
+
+export type OgFetchOutcome = 'cached' | 'stale' | 'revalidated' | 'fetched' | 'failed' | 'backoff';
+
+export interface OgResolution {
+  metadata: OgMetadata;
+  outcome: OgFetchOutcome;
+  durationMs: number;
+  // Background refresh of a stale entry, unless revalidation is deferred
+  revalidation?: Promise<OgResolution>;
+}
+
+export interface OgCacheOptions {
+  // Serve expired entries immediately and refresh them in the background
+  staleWhileRevalidate?: boolean;
+  // The caller writes the cache with flushOgCache() (builds); otherwise entries are written back after a short delay
+  explicitFlush?: boolean;
+  // Stale entries are only refreshed through revalidateOgMetadata() (builds, where the prefetch pool bounds requests)
+  deferRevalidation?: boolean;
+}
+
+// Cache file path, under the shared build cache folder (.cache unless CACHE_DIR is set)
+const CACHE_PATH = join(CACHE_DIR, 'og-metadata.json');
+
+// Bump when the cache file layout changes
+const CACHE_VERSION = 2;
 
 // Cache duration in milliseconds (7 days)
 const CACHE_DURATION = 7 * 24 * 60 * 60 * 1000;
 
+// Backoff after a failed fetch: 1 hour, doubling per failure, capped at the cache duration
+const FAILURE_BACKOFF = 60 * 60 * 1000;
+
+// Delay before dirty entries are written back when nobody flushes explicitly (dev server)
+const FLUSH_DELAY = 1000;
+
+interface OgCacheState {
+  cache: OgCache | null;
+  dirty: boolean;
+  flushTimer: ReturnType<typeof setTimeout> | null;
+  inFlight: Map<string, Promise<OgResolution>>;
+  options: Required<OgCacheOptions>;
+}
+
+// The build loads this module twice (once from astro.config via the prefetch integration,
+// once from the bundled pages), so the state lives on globalThis to be shared by both.
+const STATE_KEY = Symbol.for('website.og-metadata.state');
+const state: OgCacheState = ((globalThis as Record<symbol, unknown>)[STATE_KEY] ??= {
+  cache: null,
+  dirty: false,
+  flushTimer: null,
+  inFlight: new Map(),
+  options: { staleWhileRevalidate: false, explicitFlush: false, deferRevalidation: false },
+}) as OgCacheState;
+
+export function configureOgCache(options: OgCacheOptions): void {
+  state.options = { ...state.options, ...options };
+}
+
 function loadCache(): OgCache {
   try {
     if (existsSync(CACHE_PATH)) {
-      const data = readFileSync(CACHE_PATH, 'utf-8');
-      return JSON.parse(data);
+      const data = JSON.parse(readFileSync(CACHE_PATH, 'utf-8'));
+      if (data.version === CACHE_VERSION) {
+        return (data as OgCacheFile).entries;
+      }
+      // Unversioned cache: a flat map of metadata, kept as entries without validators
+      if (data.version === undefined) {
+        return Object.fromEntries(Object.entries(data as Record<string, OgMetadata>).map(([url, metadata]) => [url, { metadata }]));
+      }
     }
   } catch (error) {
     console.warn('Failed to load OG cache:', error);
@@ -39,18 +113,67 @@ function saveCache(cache: OgCache): void {
     if (!existsSync(cacheDir)) {
       mkdirSync(cacheDir, { recursive: true });
     }
-    writeFileSync(CACHE_PATH, JSON.stringify(cache, null, 2), 'utf-8');
+    const file: OgCacheFile = { version: CACHE_VERSION, entries: cache };
+    writeFileSync(CACHE_PATH, JSON.stringify(file, null, 2), 'utf-8');
   } catch (error) {
     console.warn('Failed to save OG cache:', error);
   }
 }
 
-function isCacheValid(metadata: OgMetadata): boolean {
-  const fetchedAt = new Date(metadata.fetchedAt).getTime();
+function getCache(): OgCache {
+  if (!state.cache) {
+    state.cache = loadCache();
+  }
+  return state.cache;
+}
+
+function setCacheEntry(url: string, entry: OgCacheEntry): void {
+  getCache()[url] = entry;
+  state.dirty = true;
+  if (!state.options.explicitFlush) {
+    scheduleFlush();
+  }
+}
+
+function scheduleFlush(): void {
+  if (state.flushTimer) {
+    clearTimeout(state.flushTimer);
+  }
+  state.flushTimer = setTimeout(flushOgCache, FLUSH_DELAY);
+}
+
+export function flushOgCache(): void {
+  if (state.flushTimer) {
+    clearTimeout(state.flushTimer);
+    state.flushTimer = null;
+  }
+  if (!state.cache || !state.dirty) {
+    return;
+  }
+  saveCache(state.cache);
+  state.dirty = false;
+}
+
+/**
+ * Wait for background revalidations started in stale-while-revalidate mode.
+ */
+export async function settleOgRevalidations(): Promise<void> {
+  await Promise.allSettled(state.inFlight.values());
+}
+
+function isFailed(entry: OgCacheEntry): boolean {
+  return (entry.failures ?? 0) > 0;
+}
+
+function isCacheValid(entry: OgCacheEntry): boolean {
+  if (isFailed(entry)) {
+    return entry.retryAt !== undefined && Date.now() < new Date(entry.retryAt).getTime();
+  }
+  const fetchedAt = new Date(entry.metadata.fetchedAt).getTime();
   return Date.now() - fetchedAt < CACHE_DURATION;
 }
 
-function normalizeUrl(url: string): string {
+export function normalizeUrl(url: string): string {
   try {
     const parsed = new URL(url);
     // Remove trailing slash for consistency
@@ -60,44 +183,27 @@ function normalizeUrl(url: string): string {
   }
 }
 
-function extractMetaContent(html: string, selectors: string[]): string | undefined {
+function extractMetaContent(head: HtmlHead, selectors: string[]): string | undefined {
+  // Meta tags are keyed by their og:, twitter: or name= identifier
   for (const selector of selectors) {
-    // Match og:, twitter:, or name= meta tags
-    const patterns = [
-      new RegExp(`<meta[^>]*property=["']${selector}["'][^>]*content=["']([^"']*)["']`, 'i'),
-      new RegExp(`<meta[^>]*content=["']([^"']*)["'][^>]*property=["']${selector}["']`, 'i'),
-      new RegExp(`<meta[^>]*name=["']${selector}["'][^>]*content=["']([^"']*)["']`, 'i'),
-      new RegExp(`<meta[^>]*content=["']([^"']*)["'][^>]*name=["']${selector}["']`, 'i'),
-    ];
-
-    for (const pattern of patterns) {
-      const match = html.match(pattern);
-      if (match?.[1]) {
-        return decodeHtmlEntities(match[1]);
-      }
+    const content = head.meta[selector];
+    if (content) {
+      return decodeHtmlEntities(content);
     }
   }
   return undefined;
 }
 
-function extractTitle(html: string): string | undefined {
-  const titleMatch = html.match(/<title[^>]*>([^<]*)<\/title>/i);
-  return titleMatch?.[1] ? decodeHtmlEntities(titleMatch[1].trim()) : undefined;
+function extractTitle(head: HtmlHead): string | undefined {
+  return head.title?.trim() ? decodeHtmlEntities(head.title.trim()) : undefined;
 }
 
-function extractFavicon(html: string, baseUrl: string): string | undefined {
+function extractFavicon(head: HtmlHead, baseUrl: string): string | undefined {
   // Look for various favicon link tags
-  const patterns = [
-    /<link[^>]*rel=["'](?:shortcut )?icon["'][^>]*href=["']([^"']*)["']/i,
-    /<link[^>]*href=["']([^"']*)["'][^>]*rel=["'](?:shortcut )?icon["']/i,
-    /<link[^>]*rel=["']apple-touch-icon["'][^>]*href=["']([^"']*)["']/i,
-  ];
-
-  for (const pattern of patterns) {
-    const match = html.match(pattern);
-    if (match?.[1]) {
-      return resolveUrl(match[1], baseUrl);
-    }
+  const icon =
+    head.links.find(({ rel }) => rel === 'icon' || rel === 'shortcut icon') ?? head.links.find(({ rel }) => rel === 'apple-touch-icon');
+  if (icon) {
+    return resolveUrl(icon.href, baseUrl);
   }
 
   // Fallback to /favicon.ico
@@ -149,87 +255,180 @@ function createFallbackMetadata(url: string): OgMetadata {
   };
 }
 
-async function fetchMetadata(url: string): Promise<OgMetadata> {
+export function extractOgMetadata(head: HtmlHead, url: string): OgMetadata {
+  const title = extractMetaContent(head, ['og:title', 'twitter:title']) || extractTitle(head) || getDomainName(url);
+
+  const description = extractMetaContent(head, ['og:description', 'twitter:description', 'description']) || '';
+
+  const image = extractMetaContent(head, ['og:image', 'twitter:image']);
+  const resolvedImage = image ? resolveUrl(image, url) : undefined;
+
+  const siteName = extractMetaContent(head, ['og:site_name']) || getDomainName(url);
+
+  const favicon = extractFavicon(head, url);
+
+  return {
+    url,
+    title: title.trim(),
+    description: description.trim(),
+    image: resolvedImage,
+    siteName,
+    favicon,
+    fetchedAt: new Date().toISOString(),
+  };
+}
+
+type FetchResult =
+  | { kind: 'ok'; metadata: OgMetadata; etag?: string; lastModified?: string }
+  | { kind: 'not-modified'; etag?: string; lastModified?: string }
+  | { kind: 'failed' };
+
+async function fetchMetadata(url: string, previous?: OgCacheEntry): Promise<FetchResult> {
+  const headers: Record<string, string> = {
+    'User-Agent': 'Mozilla/5.0 (compatible; OGFetcher/1.0)',
+    Accept: 'text/html,application/xhtml+xml',
+  };
+  // Validators only exist on entries that were fetched successfully at least once
+  if (previous?.etag) headers['If-None-Match'] = previous.etag;
+  if (previous?.lastModified) headers['If-Modified-Since'] = previous.lastModified;
+
   try {
+    countMetric('og.requests');
     const response = await fetch(url, {
-      headers: {
-        'User-Agent': 'Mozilla/5.0 (compatible; OGFetcher/1.0)',
-        Accept: 'text/html,application/xhtml+xml',
-      },
+      headers,
       signal: AbortSignal.timeout(10000), // 10 second timeout
     });
 
+    const etag = response.headers.get('etag') ?? undefined;
+    const lastModified = response.headers.get('last-modified') ?? undefined;
+
+    if (response.status === 304) {
+      await response.body?.cancel();
+      return { kind: 'not-modified', etag, lastModified };
+    }
+
     if (!response.ok) {
       console.warn(`Failed to fetch ${url}: ${response.status}`);
-      return createFallbackMetadata(url);
+      await response.body?.cancel();
+      return { kind: 'failed' };
     }
 
-    const html = await response.text();
-
-    const title =
-      extractMetaContent(html, ['og:title', 'twitter:title']) ||
-      extractTitle(html) ||
-      getDomainName(url);
+    if (!response.body) {
+      return { kind: 'failed' };
+    }
 
-    const description =
-      extractMetaContent(html, ['og:description', 'twitter:description', 'description']) || '';
+    // Only the <head> is needed, the rest of the download is cancelled
+    const head = await readHtmlHead(response.body);
 
-    const image = extractMetaContent(html, ['og:image', 'twitter:image']);
-    const resolvedImage = image ? resolveUrl(image, url) : undefined;
+    return {
+      kind: 'ok',
+      metadata: extractOgMetadata(head, url),
+      etag,
+      lastModified,
+    };
+  } catch (error) {
+    console.warn(`Error fetching metadata for ${url}:`, error);
+    return { kind: 'failed' };
+  }
+}
 
-    const siteName = extractMetaContent(html, ['og:site_name']) || getDomainName(url);
+function nextCacheEntry(url: string, result: FetchResult, previous?: OgCacheEntry): OgCacheEntry {
+  const now = new Date();
 
-    const favicon = extractFavicon(html, url);
+  if (result.kind === 'ok') {
+    return { metadata: result.metadata, etag: result.etag, lastModified: result.lastModified };
+  }
 
+  if (result.kind === 'not-modified' && previous) {
     return {
-      url,
-      title: title.trim(),
-      description: description.trim(),
-      image: resolvedImage,
-      siteName,
-      favicon,
-      fetchedAt: new Date().toISOString(),
+      metadata: { ...previous.metadata, fetchedAt: now.toISOString() },
+      etag: result.etag ?? previous.etag,
+      lastModified: result.lastModified ?? previous.lastModified,
     };
-  } catch (error) {
-    console.warn(`Error fetching metadata for ${url}:`, error);
-    return createFallbackMetadata(url);
   }
+
+  // Keep serving the last good metadata, if any, while backing off; its
+  // validators let the retry be a conditional request
+  const failures = (previous?.failures ?? 0) + 1;
+  const delay = Math.min(FAILURE_BACKOFF * 2 ** (failures - 1), CACHE_DURATION);
+  return {
+    metadata: previous?.metadata ?? createFallbackMetadata(url),
+    etag: previous?.etag,
+    lastModified: previous?.lastModified,
+    failures,
+    retryAt: new Date(now.getTime() + delay).toISOString(),
+  };
 }
 
-export async function getOgMetadata(url: string): Promise<OgMetadata> {
+function revalidate(url: string, previous?: OgCacheEntry): Promise<OgResolution> {
+  // Join a request that is already running for this URL
+  const pending = state.inFlight.get(url);
+  if (pending) {
+    return pending;
+  }
+
+  const startedAt = performance.now();
+  const request = fetchMetadata(url, previous)
+    .then((result): OgResolution => {
+      const entry = nextCacheEntry(url, result, previous);
+      setCacheEntry(url, entry);
+      const outcome = result.kind === 'ok' ? 'fetched' : result.kind === 'not-modified' ? 'revalidated' : 'failed';
+      return { metadata: entry.metadata, outcome, durationMs: performance.now() - startedAt };
+    })
+    .finally(() => state.inFlight.delete(url));
+
+  state.inFlight.set(url, request);
+  return request;
+}
+
+/**
+ * Resolve metadata for a URL from the in-memory cache, or fetch it.
+ * Concurrent calls for the same URL share a single request.
+ */
+export function resolveOgMetadata(url: string, force = false): Promise<OgResolution> {
   const normalizedUrl = normalizeUrl(url);
-  const cache = loadCache();
+  const cached = getCache()[normalizedUrl];
 
-  // Check if we have valid cached data
-  const cached = cache[normalizedUrl];
-  if (cached && isCacheValid(cached)) {
-    return cached;
+  if (force || !cached) {
+    return revalidate(normalizedUrl, force ? undefined : cached);
   }
 
-  // Fetch fresh metadata
-  const metadata = await fetchMetadata(normalizedUrl);
+  // Check if we have valid cached data
+  if (isCacheValid(cached)) {
+    return Promise.resolve({ metadata: cached.metadata, outcome: isFailed(cached) ? 'backoff' : 'cached', durationMs: 0 });
+  }
 
-  // Update cache
-  cache[normalizedUrl] = metadata;
-  saveCache(cache);
+  // Expired: answer with what we have and refresh in the background
+  if (state.options.staleWhileRevalidate) {
+    if (state.options.deferRevalidation) {
+      return Promise.resolve({ metadata: cached.metadata, outcome: 'stale', durationMs: 0 });
+    }
+    const revalidation = revalidate(normalizedUrl, cached);
+    return Promise.resolve({ metadata: cached.metadata, outcome: 'stale', durationMs: 0, revalidation });
+  }
 
-  return metadata;
+  return revalidate(normalizedUrl, cached);
 }
 
-export async function refreshOgMetadata(url: string): Promise<OgMetadata> {
+/**
+ * Refresh a cached entry now, with a conditional request when it has validators.
+ */
+export function revalidateOgMetadata(url: string): Promise<OgResolution> {
   const normalizedUrl = normalizeUrl(url);
-  const cache = loadCache();
-
-  // Force fetch fresh metadata
-  const metadata = await fetchMetadata(normalizedUrl);
+  return revalidate(normalizedUrl, getCache()[normalizedUrl]);
+}
 
-  // Update cache
-  cache[normalizedUrl] = metadata;
-  saveCache(cache);
+export async function getOgMetadata(url: string): Promise<OgMetadata> {
+  return (await resolveOgMetadata(url)).metadata;
+}
 
-  return metadata;
+export async function refreshOgMetadata(url: string): Promise<OgMetadata> {
+  // Force fetch fresh metadata
+  return (await resolveOgMetadata(url, true)).metadata;
 }
 
 export function clearOgCache(): void {
-  saveCache({});
+  state.cache = {};
+  state.dirty = true;
+  flushOgCache();
 }
@@ -0,0 +1,85 @@
+import assert from 'node:assert/strict';
+import { mkdirSync, mkdtempSync, writeFileSync } from 'node:fs';
+import { createServer, type Server } from 'node:http';
+import type { AddressInfo } from 'node:net';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { after, before, describe, test } from 'node:test';
+
+// The cache folder is read when the modules load, so they are imported once it is set
+const rootDir = mkdtempSync(join(tmpdir(), 'og-prefetch-'));
+const contentDir = join(rootDir, 'blog');
+process.env.CACHE_DIR = join(rootDir, 'cache');
+
+const DAY = 24 * 60 * 60 * 1000;
+
+let og: typeof import('./og-metadata');
+let prefetch: typeof import('./og-prefetch');
+let server: Server;
+let baseUrl: string;
+
+// The stale page only answers once released
+let releaseSlowPage: () => void;
+const slowPageReleased = new Promise<void>((resolve) => (releaseSlowPage = resolve));
+let slowPageServed = false;
+let slowRequests = 0;
+
+function page(title: string): string {
+  return `<!doctype html><html><head><title>${title}</title><meta property="og:title" content="${title}"></head><body></body></html>`;
+}
+
+before(async () => {
+  server = createServer(async (request, response) => {
+    if (request.url === '/slow') {
+      slowRequests++;
+      await slowPageReleased;
+      slowPageServed = true;
+      response.writeHead(200, { 'Content-Type': 'text/html' }).end(page('Refreshed'));
+    } else if (request.url === '/new') {
+      response.writeHead(200, { 'Content-Type': 'text/html' }).end(page('New'));
+    } else {
+      response.writeHead(404).end();
+    }
+  });
+  await new Promise<void>((resolve) => server.listen(0, '127.0.0.1', resolve));
+  baseUrl = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+
+  mkdirSync(contentDir, { recursive: true });
+  writeFileSync(join(contentDir, 'post.mdx'), `<UrlEmbed url="${baseUrl}/slow" />\n\n<UrlEmbed url="${baseUrl}/new" />\n`);
+
+  // An entry fetched eight days ago: expired, so served stale
+  mkdirSync(process.env.CACHE_DIR!, { recursive: true });
+  const fetchedAt = new Date(Date.now() - 8 * DAY).toISOString();
+  writeFileSync(
+    join(process.env.CACHE_DIR!, 'og-metadata.json'),
+    JSON.stringify({ version: 2, entries: { [`${baseUrl}/slow`]: { metadata: { url: `${baseUrl}/slow`, title: 'Stale', description: '', fetchedAt } } } }),
+  );
+
+  og = await import('./og-metadata');
+  prefetch = await import('./og-prefetch');
+  og.configureOgCache({ staleWhileRevalidate: true, explicitFlush: true, deferRevalidation: true });
+});
+
+after(() => {
+  server.close();
+});
+
+describe('og-prefetch', () => {
+  test('returns before stale entries are refreshed, and waits for missing ones', async () => {
+    const report = await prefetch.prefetchOgMetadata({ contentDir });
+    assert.equal(report.total, 2);
+    assert.equal(report.fetched, 1);
+    assert.equal(report.stale, 1);
+    assert.equal(slowPageServed, false);
+    assert.equal(await og.getOgMetadata(`${baseUrl}/new`).then(({ title }) => title), 'New');
+    // Pages rendered meanwhile get the stale metadata without starting a request of their own
+    assert.equal(await og.getOgMetadata(`${baseUrl}/slow`).then(({ title }) => title), 'Stale');
+
+    releaseSlowPage();
+    const refreshed = await report.revalidation!;
+    assert.equal(refreshed.total, 1);
+    assert.equal(refreshed.fetched, 1);
+    assert.equal(await og.getOgMetadata(`${baseUrl}/slow`).then(({ title }) => title), 'Refreshed');
+    assert.equal(slowRequests, 1);
+  });
+});
@@ -0,0 +1,129 @@
+import { readdirSync, readFileSync } from 'node:fs';
+import { join, resolve } from 'node:path';
+import { flushOgCache, normalizeUrl, resolveOgMetadata, revalidateOgMetadata, type OgFetchOutcome, type OgResolution } from './og-metadata';
+import { runPool } from './pool';
+
+export interface OgPrefetchOptions {
+  contentDir?: string;
+  concurrency?: number;
+  perHostConcurrency?: number;
+}
+
+export interface OgHostTiming {
+  host: string;
+  requests: number;
+  totalMs: number;
+  maxMs: number;
+}
+
+export interface OgPrefetchReport extends Record<OgFetchOutcome, number> {
+  total: number;
+  durationMs: number;
+  slowestHosts: OgHostTiming[];
+  // Background refresh of the stale entries, still running when the prefetch returns
+  revalidation?: Promise<OgPrefetchReport>;
+}
+
+const DEFAULT_CONTENT_DIR = process.env.BLOG_CONTENT_DIR ? resolve(process.env.BLOG_CONTENT_DIR) : join(process.cwd(), 'src', 'content', 'blog');
+
+// Matches <UrlEmbed url="..." /> in MDX sources
+const URL_EMBED_PATTERN = /<UrlEmbed\s[^>]*?url=["']([^"']+)["']/g;
+
+const NETWORK_OUTCOMES = new Set<OgFetchOutcome>(['fetched', 'revalidated', 'failed']);
+
+function getHost(url: string): string {
+  try {
+    return new URL(url).hostname;
+  } catch {
+    return url;
+  }
+}
+
+export function collectEmbedUrls(contentDir = DEFAULT_CONTENT_DIR): string[] {
+  const urls = new Set<string>();
+  const files = readdirSync(contentDir, { recursive: true, encoding: 'utf-8' }).filter((file) => /\.mdx?$/.test(file));
+
+  for (const file of files) {
+    const source = readFileSync(join(contentDir, file), 'utf-8');
+    for (const match of source.matchAll(URL_EMBED_PATTERN)) {
+      urls.add(normalizeUrl(match[1]));
+    }
+  }
+
+  return [...urls];
+}
+
+// Resolve every URL through a bounded pool, counting outcomes and timing the hosts hit over the network
+async function resolveAll(
+  urls: string[],
+  resolve: (url: string) => Promise<OgResolution>,
+  { concurrency, perHostConcurrency }: Required<Pick<OgPrefetchOptions, 'concurrency' | 'perHostConcurrency'>>,
+): Promise<OgPrefetchReport> {
+  const startedAt = performance.now();
+  const outcomes: Record<OgFetchOutcome, number> = { cached: 0, stale: 0, revalidated: 0, fetched: 0, failed: 0, backoff: 0 };
+  const hosts = new Map<string, OgHostTiming>();
+
+  await runPool(
+    urls,
+    async (url) => {
+      const { outcome, durationMs } = await resolve(url);
+      outcomes[outcome]++;
+      // Only network round-trips count towards host timings
+      if (!NETWORK_OUTCOMES.has(outcome)) return;
+
+      const host = getHost(url);
+      const timing = hosts.get(host) ?? { host, requests: 0, totalMs: 0, maxMs: 0 };
+      timing.requests++;
+      timing.totalMs += durationMs;
+      timing.maxMs = Math.max(timing.maxMs, durationMs);
+      hosts.set(host, timing);
+    },
+    { concurrency, perKey: perHostConcurrency, keyOf: getHost },
+  );
+
+  return {
+    total: urls.length,
+    ...outcomes,
+    durationMs: performance.now() - startedAt,
+    slowestHosts: [...hosts.values()].sort((a, b) => b.totalMs - a.totalMs).slice(0, 5),
+  };
+}
+
+/**
+ * Fetch the OG metadata of every UrlEmbed found in the blog content up front,
+ * so page rendering only hits the in-memory cache. Only missing entries are
+ * waited for: stale ones are refreshed in the background, through the same
+ * bounded pool, and `report.revalidation` settles once they are done.
+ */
+export async function prefetchOgMetadata({ contentDir, concurrency = 8, perHostConcurrency = 2 }: OgPrefetchOptions = {}): Promise<OgPrefetchReport> {
+  const limits = { concurrency, perHostConcurrency };
+  const staleUrls: string[] = [];
+
+  const report = await resolveAll(
+    collectEmbedUrls(contentDir),
+    async (url) => {
+      const resolution = await resolveOgMetadata(url);
+      if (resolution.outcome === 'stale') {
+        staleUrls.push(url);
+      }
+      return resolution;
+    },
+    limits,
+  );
+  flushOgCache();
+
+  if (staleUrls.length > 0) {
+    report.revalidation = resolveAll(staleUrls, revalidateOgMetadata, limits);
+  }
+  return report;
+}
+
+export function formatOgPrefetchReport(report: OgPrefetchReport): string[] {
+  return [
+    `${report.total} embed URLs in ${Math.round(report.durationMs)}ms: ${report.fetched} fetched, ${report.revalidated} revalidated (304), ` +
+      `${report.cached} cached, ${report.stale} stale, ${report.failed} failed, ${report.backoff} in backoff`,
+    ...report.slowestHosts.map(
+      ({ host, requests, totalMs, maxMs }) => `  ${host}: ${requests} request(s), ${Math.round(totalMs)}ms total, ${Math.round(maxMs)}ms max`,
+    ),
+  ];
+}
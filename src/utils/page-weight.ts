@@ -0,0 +1,164 @@
+import { existsSync, readdirSync, readFileSync, statSync } from 'node:fs';
+import { extname, join } from 'node:path';
+
+export type ResourceType = 'html' | 'js' | 'css' | 'image' | 'font' | 'other';
+
+export type ResourceBytes = Record<ResourceType, number>;
+
+export interface PageWeight {
+  route: string;
+  bytes: ResourceBytes & { total: number };
+  // Third-party resources the page loads up-front (Google Fonts, ...), not sized offline
+  external: string[];
+}
+
+const TYPES_BY_EXTENSION: Record<string, ResourceType> = {
+  '.html': 'html',
+  '.js': 'js',
+  '.mjs': 'js',
+  '.css': 'css',
+  '.avif': 'image',
+  '.webp': 'image',
+  '.png': 'image',
+  '.jpg': 'image',
+  '.jpeg': 'image',
+  '.gif': 'image',
+  '.svg': 'image',
+  '.woff2': 'font',
+  '.woff': 'font',
+  '.ttf': 'font',
+  '.otf': 'font',
+};
+
+const TAG_PATTERN = /<(script|link|img|source|picture|\/picture)\b([^>]*)>/gi;
+const ATTRIBUTE_PATTERN = /([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))/g;
+const CSS_URL_PATTERN = /url\(\s*["']?([^"')]+)["']?\s*\)/g;
+
+export function resourceType(path: string): ResourceType {
+  return TYPES_BY_EXTENSION[extname(path.split(/[?#]/)[0]).toLowerCase()] ?? 'other';
+}
+
+function emptyBytes(): ResourceBytes {
+  return { html: 0, js: 0, css: 0, image: 0, font: 0, other: 0 };
+}
+
+function parseAttributes(source: string): Record<string, string> {
+  const attributes: Record<string, string> = {};
+  for (const [, name, double, single, bare] of source.matchAll(ATTRIBUTE_PATTERN)) {
+    attributes[name.toLowerCase()] = double ?? single ?? bare;
+  }
+  return attributes;
+}
+
+// Pessimistic pick: the widest candidate is what large screens download
+function largestCandidate(srcset: string): string | undefined {
+  return srcset
+    .split(',')
+    .map((candidate) => candidate.trim().split(/\s+/))
+    .filter(([url]) => url)
+    .map(([url, descriptor = '1x']) => ({ url, size: parseFloat(descriptor) || 1 }))
+    .sort((a, b) => b.size - a.size)[0]?.url;
+}
+
+/**
+ * Resources a page requests when fully scrolled, without interaction: scripts,
+ * stylesheets, preloads and one candidate per image. Facade templates only load
+ * on demand, so their content is skipped.
+ */
+export function collectPageResources(html: string): string[] {
+  const resources: string[] = [];
+  let inPicture = false;
+  let pictureResolved = false;
+
+  for (const [, rawTag, rawAttributes] of html.replace(/<template\b[\s\S]*?<\/template>/gi, '').matchAll(TAG_PATTERN)) {
+    const tag = rawTag.toLowerCase();
+    const attributes = parseAttributes(rawAttributes);
+
+    if (tag === 'picture') {
+      inPicture = true;
+      pictureResolved = false;
+    } else if (tag === '/picture') {
+      inPicture = false;
+    } else if (tag === 'script' && attributes.src) {
+      resources.push(attributes.src);
+    } else if (tag === 'link' && attributes.href && /\b(stylesheet|preload|modulepreload)\b/i.test(attributes.rel ?? '')) {
+      resources.push(attributes.href);
+    } else if ((tag === 'source' || tag === 'img') && !(inPicture && pictureResolved)) {
+      // The first <source> of a <picture> is the format modern browsers pick
+      const url = (attributes.srcset && largestCandidate(attributes.srcset)) || attributes.src;
+      if (url) {
+        resources.push(url);
+        pictureResolved = inPicture;
+      }
+    }
+  }
+
+  return resources;
+}
+
+function isExternal(url: string): boolean {
+  return /^(https?:)?\/\//i.test(url);
+}
+
+function toRoute(file: string): string {
+  const route = `/${file.split('\\').join('/')}`.replace(/index\.html$/, '').replace(/\.html$/, '');
+  return route || '/';
+}
+
+/**
+ * Weigh every HTML page of a build output. Local resources are sized from the
+ * output folder, including fonts referenced by local stylesheets; each page
+ * counts a shared resource once.
+ */
+export function measurePageWeights(outDir: string): PageWeight[] {
+  const sizes = new Map<string, number>();
+  const fontsByStylesheet = new Map<string, string[]>();
+
+  const sizeOf = (url: string): number | undefined => {
+    const path = join(outDir, decodeURI(url.split(/[?#]/)[0]));
+    if (!sizes.has(path)) {
+      sizes.set(path, existsSync(path) ? statSync(path).size : NaN);
+    }
+    const size = sizes.get(path)!;
+    return Number.isNaN(size) ? undefined : size;
+  };
+
+  const fontsOf = (stylesheet: string): string[] => {
+    let fonts = fontsByStylesheet.get(stylesheet);
+    if (!fonts) {
+      const path = join(outDir, decodeURI(stylesheet.split(/[?#]/)[0]));
+      const css = existsSync(path) ? readFileSync(path, 'utf-8') : '';
+      fonts = [...css.matchAll(CSS_URL_PATTERN)].map(([, url]) => new URL(url, `file://${stylesheet}`).pathname).filter((url) => resourceType(url) === 'font');
+      fontsByStylesheet.set(stylesheet, fonts);
+    }
+    return fonts;
+  };
+
+  return readdirSync(outDir, { recursive: true, encoding: 'utf-8' })
+    .filter((file) => file.endsWith('.html'))
+    .sort()
+    .map((file) => {
+      const html = readFileSync(join(outDir, file), 'utf-8');
+      const bytes = emptyBytes();
+      bytes.html = Buffer.byteLength(html);
+
+      const external = new Set<string>();
+      const local = new Set<string>();
+      for (const url of collectPageResources(html)) {
+        if (isExternal(url)) {
+          external.add(url);
+        } else if (!url.startsWith('data:')) {
+          const absolute = new URL(url, `file:///${file}`).pathname;
+          local.add(absolute);
+          if (resourceType(absolute) === 'css') fontsOf(absolute).forEach((font) => local.add(font));
+        }
+      }
+
+      for (const url of local) {
+        bytes[resourceType(url)] += sizeOf(url) ?? 0;
+      }
+
+      const total = Object.values(bytes).reduce((sum, value) => sum + value, 0);
+      return { route: toRoute(file), bytes: { ...bytes, total }, external: [...external] };
+    });
+}
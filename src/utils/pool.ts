@@ -0,0 +1,42 @@
+/**
+ * Run `worker` over `items` with at most `concurrency` tasks in flight overall
+ * and at most `perKey` tasks in flight for items sharing the same key.
+ */
+export async function runPool<T>(
+  items: T[],
+  worker: (item: T) => Promise<void>,
+  { concurrency, perKey = Infinity, keyOf = () => '' }: { concurrency: number; perKey?: number; keyOf?: (item: T) => string },
+): Promise<void> {
+  const pending = [...items];
+  const active = new Map<string, number>();
+  let running = 0;
+
+  await new Promise<void>((resolve) => {
+    const next = () => {
+      if (pending.length === 0 && running === 0) {
+        resolve();
+        return;
+      }
+
+      while (running < concurrency) {
+        // Pick the first queued item whose key still has a free slot
+        const index = pending.findIndex((item) => (active.get(keyOf(item)) ?? 0) < perKey);
+        if (index === -1) break;
+
+        const [item] = pending.splice(index, 1);
+        const key = keyOf(item);
+        active.set(key, (active.get(key) ?? 0) + 1);
+        running++;
+
+        worker(item)
+          .catch((error) => console.warn('Pool task failed:', error))
+          .finally(() => {
+            running--;
+            active.set(key, (active.get(key) ?? 1) - 1);
+            next();
+          });
+      }
+    };
+    next();
+  });
+}
@@ -0,0 +1,47 @@
+import { getOptimizedImage, toSrcset } from './image-pipeline';
+
+interface HastNode {
+  type: string;
+  tagName?: string;
+  properties?: Record<string, unknown>;
+  children?: HastNode[];
+}
+
+const DEFAULT_SIZES = '(min-width: 800px) 768px, 100vw';
+
+function toPicture(image: HastNode, sizes: string): HastNode | undefined {
+  const src = image.properties?.src;
+  const optimized = typeof src === 'string' ? getOptimizedImage(src) : undefined;
+  if (!optimized) return undefined;
+
+  return {
+    type: 'element',
+    tagName: 'picture',
+    properties: {},
+    children: [
+      { type: 'element', tagName: 'source', properties: { type: 'image/avif', srcSet: toSrcset(optimized.variants.avif), sizes }, children: [] },
+      { type: 'element', tagName: 'source', properties: { type: 'image/webp', srcSet: toSrcset(optimized.variants.webp), sizes }, children: [] },
+      {
+        ...image,
+        properties: { ...image.properties, width: optimized.width, height: optimized.height, loading: 'lazy', decoding: 'async' },
+      },
+    ],
+  };
+}
+
+/**
+ * Rewrite markdown images that went through the image pipeline into
+ * <picture> elements with AVIF/WebP srcsets and intrinsic dimensions.
+ */
+export default function rehypeResponsiveImages({ sizes = DEFAULT_SIZES }: { sizes?: string } = {}) {
+  const visit = (node: HastNode) => {
+    node.children = node.children?.map((child) => {
+      if (child.type === 'element' && child.tagName === 'img') {
+        return toPicture(child, sizes) ?? child;
+      }
+      visit(child);
+      return child;
+    });
+  };
+  return (tree: HastNode) => visit(tree);
+}
@@ -0,0 +1,87 @@
+import { shardOf, tokenize } from './search-tokenizer';
+import type { SearchManifest, SearchResultDocument, SearchShard } from './search-index';
+
+export interface SearchResult extends SearchResultDocument {
+  score: number;
+}
+
+interface LoadedManifest {
+  docs: SearchResultDocument[];
+  shards: Set<string>;
+}
+
+// Exact term matches rank above prefix-only matches
+const EXACT_MATCH_BOOST = 2;
+
+// Index of the first term >= prefix in a sorted shard
+function lowerBound(shard: SearchShard, prefix: string): number {
+  let low = 0;
+  let high = shard.length;
+  while (low < high) {
+    const mid = (low + high) >>> 1;
+    if (shard[mid][0] < prefix) low = mid + 1;
+    else high = mid;
+  }
+  return low;
+}
+
+function matchPrefix(shard: SearchShard, prefix: string): Map<number, number> {
+  const scores = new Map<number, number>();
+  for (let i = lowerBound(shard, prefix); i < shard.length && shard[i][0].startsWith(prefix); i++) {
+    const [term, postings] = shard[i];
+    const boost = term === prefix ? EXACT_MATCH_BOOST : 1;
+    for (let p = 0; p < postings.length; p += 2) {
+      scores.set(postings[p], (scores.get(postings[p]) ?? 0) + postings[p + 1] * boost);
+    }
+  }
+  return scores;
+}
+
+/**
+ * Browser client for the static search index. Nothing is fetched until the
+ * first search, and only the shards of the queried terms are loaded.
+ */
+export function createSearchClient(baseUrl = '/search') {
+  let manifest: Promise<LoadedManifest> | undefined;
+  const shards = new Map<string, Promise<SearchShard>>();
+
+  const loadManifest = () =>
+    (manifest ??= fetch(`${baseUrl}/index.json`)
+      .then((response) => response.json())
+      .then(({ docs, shards }: SearchManifest) => ({ docs, shards: new Set(shards) })));
+
+  const loadShard = (key: string) => {
+    let shard = shards.get(key);
+    if (!shard) {
+      shard = fetch(`${baseUrl}/${key}.json`).then((response) => response.json());
+      shards.set(key, shard);
+    }
+    return shard;
+  };
+
+  async function search(query: string, limit = 10): Promise<SearchResult[]> {
+    // Stop words are only kept as the last, still being typed, term
+    const indexed = new Set(tokenize(query));
+    const typed = tokenize(query, { keepStopWords: true });
+    const terms = typed.filter((term, i) => indexed.has(term) || i === typed.length - 1);
+    if (terms.length === 0) return [];
+
+    const { docs, shards: available } = await loadManifest();
+    if (terms.some((term) => !available.has(shardOf(term)))) return [];
+
+    const matches = await Promise.all(terms.map(async (term) => matchPrefix(await loadShard(shardOf(term)), term)));
+
+    // Every term has to match
+    const [first, ...rest] = matches;
+    const results: SearchResult[] = [];
+    for (const [docIndex, score] of first) {
+      if (rest.every((match) => match.has(docIndex))) {
+        results.push({ ...docs[docIndex], score: rest.reduce((total, match) => total + match.get(docIndex)!, score) });
+      }
+    }
+
+    return results.sort((a, b) => b.score - a.score).slice(0, limit);
+  }
+
+  return { search, preload: loadManifest };
+}
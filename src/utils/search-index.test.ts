@@ -0,0 +1,140 @@
+import assert from 'node:assert/strict';
+import { readdirSync, readFileSync } from 'node:fs';
+import { createServer, type Server } from 'node:http';
+import type { AddressInfo } from 'node:net';
+import { join } from 'node:path';
+import { after, before, describe, test } from 'node:test';
+import { createSearchClient } from './search-client';
+import { buildSearchIndex, indexDocument, MANIFEST_SIZE_BUDGET, SHARD_SIZE_BUDGET, toSearchManifest, type SearchDocument } from './search-index';
+
+const BLOG_DIR = join(process.cwd(), 'src', 'content', 'blog');
+
+// Synthetic posts added to the real ones, for the blog's projected size
+const SYNTHETIC_POSTS = 300;
+const SYNTHETIC_WORDS_PER_POST = 1500;
+
+// A query loads the manifest and its shards on first use, then reuses them
+const COLD_QUERY_BUDGET_MS = 100;
+const WARM_QUERY_BUDGET_MS = 5;
+// Warm queries are timed several times and compared by their median, so a GC pause does not fail the run
+const WARM_RUNS = 5;
+
+const QUERIES = ['nx', 'plugin', 'mono', 'cherry picked', 'nx plugin architecture', 'module federation', 'typescript the', 'zzzz'];
+
+function readPost(file: string): SearchDocument {
+  const source = readFileSync(join(BLOG_DIR, file), 'utf-8');
+  const [, frontmatter = '', body = source] = source.match(/^---\r?\n([\s\S]*?)\r?\n---\r?\n([\s\S]*)$/) ?? [];
+  const field = (name: string) => frontmatter.match(new RegExp(`^${name}:\\s*["']?(.*?)["']?\\s*$`, 'm'))?.[1];
+  const tags = [...(frontmatter.match(/^tags:\r?\n((?:[ \t]+-.*\r?\n?)*)/m)?.[1] ?? '').matchAll(/-\s*(.+)/g)].map(([, tag]) => tag.trim());
+  return { slug: file.replace(/\.mdx?$/, ''), title: field('title') ?? file, subtitle: field('subtitle'), tags, body };
+}
+
+// Deterministic posts resampled from the real posts' terms, so shards fill up with the
+// prefixes of real English ("co", "re", "in", ...) rather than evenly
+function syntheticPosts(realPosts: SearchDocument[]): SearchDocument[] {
+  let seed = 7;
+  const random = () => {
+    seed = (seed * 1664525 + 1013904223) % 4294967296;
+    return seed / 4294967296;
+  };
+
+  // Terms the real posts are indexed under, most frequent first
+  const counts = new Map<string, number>();
+  for (const post of realPosts) {
+    for (const [term, weight] of Object.entries(indexDocument(post))) {
+      counts.set(term, (counts.get(term) ?? 0) + weight);
+    }
+  }
+  const vocabulary = [...counts.entries()].sort((a, b) => b[1] - a[1] || a[0].localeCompare(b[0])).map(([term]) => term);
+
+  // Zipf's law: the term of rank r comes up in proportion to 1 / r
+  const word = () => vocabulary[Math.min(vocabulary.length - 1, Math.floor((vocabulary.length + 1) ** random()) - 1)];
+  const words = (count: number) => Array.from({ length: count }, word).join(' ');
+
+  return Array.from({ length: SYNTHETIC_POSTS }, (_, i) => ({
+    slug: `synthetic-${i}`,
+    title: words(6),
+    subtitle: words(10),
+    tags: [word(), word()],
+    body: words(SYNTHETIC_WORDS_PER_POST),
+  }));
+}
+
+const realPosts = readdirSync(BLOG_DIR)
+  .filter((file) => /\.mdx?$/.test(file))
+  .map(readPost);
+const posts = [...realPosts, ...syntheticPosts(realPosts)];
+const index = buildSearchIndex(posts.map((post) => ({ doc: { slug: post.slug, title: post.title, subtitle: post.subtitle }, terms: indexDocument(post) })));
+
+// Emitted exactly like the /search endpoints
+const files = new Map<string, string>([
+  ['/search/index.json', JSON.stringify(toSearchManifest(index))],
+  ...Object.entries(index.shards).map(([key, shard]): [string, string] => [`/search/${key}.json`, JSON.stringify(shard)]),
+]);
+
+let server: Server;
+let baseUrl: string;
+
+before(async () => {
+  server = createServer((request, response) => {
+    const body = files.get(request.url ?? '');
+    response.writeHead(body ? 200 : 404, { 'Content-Type': 'application/json' }).end(body);
+  });
+  await new Promise<void>((resolve) => server.listen(0, '127.0.0.1', resolve));
+  baseUrl = `http://127.0.0.1:${(server.address() as AddressInfo).port}/search`;
+});
+
+after(() => {
+  server.close();
+});
+
+describe('search index', () => {
+  test('keeps every shard within its size budget', () => {
+    for (const [key, shard] of Object.entries(index.shards)) {
+      const size = Buffer.byteLength(JSON.stringify(shard));
+      assert.ok(size <= SHARD_SIZE_BUDGET, `shard "${key}" is ${size} bytes`);
+    }
+  });
+
+  test('keeps the manifest within its size budget', () => {
+    const size = Buffer.byteLength(files.get('/search/index.json')!);
+    assert.ok(size <= MANIFEST_SIZE_BUDGET, `manifest is ${size} bytes`);
+  });
+
+  test('finds real posts by title, tag and prefix', async () => {
+    const { search } = createSearchClient(baseUrl);
+    const expected = realPosts.filter(({ slug }) => slug.startsWith('cherry-picked')).map(({ slug }) => slug);
+    assert.ok(expected.length > 0);
+    // Synthetic posts reuse the real terms, so they match too: only check that no real post is missed
+    for (const query of ['cherry picked', 'cherr pick']) {
+      const found = new Set((await search(query, posts.length)).map(({ slug }) => slug));
+      assert.deepEqual(
+        expected.filter((slug) => !found.has(slug)),
+        [],
+        query,
+      );
+    }
+    assert.deepEqual(await search('zzzz'), []);
+  });
+
+  test('answers queries within the latency budgets', async () => {
+    for (const query of QUERIES) {
+      const { search } = createSearchClient(baseUrl);
+
+      let startedAt = performance.now();
+      await search(query);
+      const coldMs = performance.now() - startedAt;
+
+      const warmTimes: number[] = [];
+      for (let run = 0; run < WARM_RUNS; run++) {
+        startedAt = performance.now();
+        await search(query);
+        warmTimes.push(performance.now() - startedAt);
+      }
+      const warmMs = warmTimes.sort((a, b) => a - b)[Math.floor(WARM_RUNS / 2)];
+
+      assert.ok(coldMs <= COLD_QUERY_BUDGET_MS, `"${query}" took ${coldMs.toFixed(1)}ms cold`);
+      assert.ok(warmMs <= WARM_QUERY_BUDGET_MS, `"${query}" took ${warmMs.toFixed(1)}ms warm`);
+    }
+  });
+});
@@ -0,0 +1,95 @@
+import { shardOf, tokenize } from './search-tokenizer';
+
+export interface SearchDocument {
+  slug: string;
+  title: string;
+  subtitle?: string;
+  tags: string[];
+  body: string;
+}
+
+export interface SearchResultDocument {
+  slug: string;
+  title: string;
+  subtitle?: string;
+}
+
+// Term weights of one document, cached between builds
+export type DocumentTerms = Record<string, number>;
+
+// Sorted by term so the client can binary-search prefixes.
+// Postings are flattened [docIndex, weight, docIndex, weight, ...]
+export type SearchShard = [term: string, postings: number[]][];
+
+export interface SearchIndex {
+  docs: SearchResultDocument[];
+  shards: Record<string, SearchShard>;
+}
+
+// Payload of /search/index.json: the documents and the shards that exist
+export interface SearchManifest {
+  docs: SearchResultDocument[];
+  shards: string[];
+}
+
+// Budgets of the emitted JSON, before HTTP compression. A shard above its budget
+// means the sharding prefix should grow.
+export const SHARD_SIZE_BUDGET = 64 * 1024;
+export const MANIFEST_SIZE_BUDGET = 64 * 1024;
+
+const FIELD_WEIGHTS = { title: 5, tags: 4, subtitle: 3, body: 1 };
+
+// MDX noise that should not end up in the index
+const STRIP_PATTERNS: [RegExp, string][] = [
+  [/^(import|export)\s.*$/gm, ' '],
+  [/```[\s\S]*?```/g, ' '],
+  [/!\[[^\]]*\]\([^)]*\)/g, ' '],
+  [/\[([^\]]*)\]\([^)]*\)/g, '$1'],
+  [/<[^>]+>/g, ' '],
+  [/https?:\/\/\S+/g, ' '],
+];
+
+function stripMarkdown(body: string): string {
+  return STRIP_PATTERNS.reduce((text, [pattern, replacement]) => text.replace(pattern, replacement), body);
+}
+
+export function indexDocument({ title, subtitle = '', tags, body }: SearchDocument): DocumentTerms {
+  const terms: DocumentTerms = {};
+  const add = (text: string, weight: number) => {
+    for (const term of tokenize(text)) {
+      terms[term] = (terms[term] ?? 0) + weight;
+    }
+  };
+
+  add(title, FIELD_WEIGHTS.title);
+  add(tags.join(' '), FIELD_WEIGHTS.tags);
+  add(subtitle, FIELD_WEIGHTS.subtitle);
+  add(stripMarkdown(body), FIELD_WEIGHTS.body);
+  return terms;
+}
+
+export function buildSearchIndex(documents: { doc: SearchResultDocument; terms: DocumentTerms }[]): SearchIndex {
+  const postings = new Map<string, number[]>();
+
+  documents.forEach(({ terms }, docIndex) => {
+    for (const [term, weight] of Object.entries(terms)) {
+      let list = postings.get(term);
+      if (!list) {
+        list = [];
+        postings.set(term, list);
+      }
+      list.push(docIndex, weight);
+    }
+  });
+
+  const shards: Record<string, SearchShard> = {};
+  for (const term of [...postings.keys()].sort()) {
+    (shards[shardOf(term)] ??= []).push([term, postings.get(term)!]);
+  }
+
+  return { docs: documents.map(({ doc }) => doc), shards };
+}
+
+export function toSearchManifest({ docs, shards }: SearchIndex): SearchManifest {
+  return { docs, shards: Object.keys(shards) };
+}
@@ -0,0 +1,25 @@
+// Shared by the index build and the browser client so both see the same terms
+
+export const MIN_TERM_LENGTH = 2;
+
+// Terms are sharded by their first characters, a query only needs the shards of its terms
+export const SHARD_PREFIX_LENGTH = 2;
+
+const STOP_WORDS = new Set(
+  'a an and are as at be but by can do for from has have how if in into is it its not of on or so that the their then there these this to was we what when which will with you your'.split(
+    ' ',
+  ),
+);
+
+export function tokenize(text: string, { keepStopWords = false } = {}): string[] {
+  return text
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .split(/[^a-z0-9]+/)
+    .filter((term) => term.length >= MIN_TERM_LENGTH && (keepStopWords || !STOP_WORDS.has(term)));
+}
+
+export function shardOf(term: string): string {
+  return term.slice(0, SHARD_PREFIX_LENGTH);
+}